@@ -0,0 +1,174 @@
+
+import os
+import glob
+import json
+import argparse
+from pdf_cache import file_digest
+
+# Configuration
+REGISTRY_FILE = "acts.json"
+REGISTRY_VERSION = 1
+
+# The acts the extractors read are listed in REGISTRY_FILE instead of being
+# hardcoded in each script. Every entry has a short key (for --act), the act
+# name used in the output, a file name or glob pattern inside pdf_dir, the
+# profile that says which extractor reads it with which patterns, and
+# optionally the SHA-256 the file is pinned to. pdf_dir is relative to the
+# registry file and can be overridden on the command line.
+
+class ChecksumMismatch(ValueError):
+    """An act's file no longer matches the checksum pinned in the registry."""
+
+class Act:
+    """One registry entry. path (and digest) are filled in once the file is resolved."""
+
+    def __init__(self, key, name, file, profile, sha256=None):
+        self.key = key
+        self.name = name
+        self.file = file
+        self.profile = profile
+        self.sha256 = sha256
+        self.path = None
+        self.digest = None
+
+    def checksum(self):
+        """SHA-256 of the resolved file, computed once."""
+        if self.digest is None:
+            self.digest = file_digest(self.path)
+        return self.digest
+
+    def to_dict(self):
+        return {"key": self.key, "name": self.name, "file": self.file,
+                "profile": self.profile, "sha256": self.sha256}
+
+class ActRegistry:
+    def __init__(self, data, pdf_dir=None, base_dir="."):
+        if data.get("version") != REGISTRY_VERSION:
+            raise ValueError(f"Unsupported registry version: {data.get('version')}")
+        self.data = data
+        self.pdf_dir = pdf_dir or os.path.normpath(os.path.join(base_dir, data.get("pdf_dir", ".")))
+        self.acts = [Act(**entry) for entry in data["acts"]]
+        self.ignore = data.get("ignore", [])
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE, pdf_dir=None):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), pdf_dir, os.path.dirname(path) or ".")
+
+    def save(self, path=REGISTRY_FILE):
+        data = dict(self.data, acts=[act.to_dict() for act in self.acts])
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+    def find(self, selector):
+        """Act by key or full name (case-insensitive), or None."""
+        wanted = selector.casefold()
+        for act in self.acts:
+            if wanted in (act.key.casefold(), act.name.casefold()):
+                return act
+        return None
+
+    def select(self, selectors=None):
+        """The acts named by selectors (all acts if none), in registry order."""
+        if not selectors:
+            return list(self.acts)
+        chosen = set()
+        for selector in selectors:
+            act = self.find(selector)
+            if act is None:
+                raise ValueError(f"Unknown act: {selector} (known: {', '.join(a.key for a in self.acts)})")
+            chosen.add(act.key)
+        return [act for act in self.acts if act.key in chosen]
+
+    def resolve(self, act):
+        """Path of the act's file in pdf_dir, or None. A glob pattern must match one file."""
+        # Without wildcards glob only checks that the path exists
+        matches = sorted(glob.glob(os.path.join(self.pdf_dir, act.file)))
+        if len(matches) > 1:
+            raise ValueError(f"{act.file} matches {len(matches)} files in {self.pdf_dir}")
+        return matches[0] if matches else None
+
+    def work_items(self, selectors=None, profiles=None, verify=True):
+        """
+        Lazily yields the selected acts whose file is present, with path set.
+        Acts whose profile is not in profiles are left out (with a note if
+        they were asked for by name) and acts without a file are skipped. A
+        pinned act whose file changed raises ChecksumMismatch, unless verify is
+        off. Files of acts that were not selected are never touched.
+        """
+        for act in self.select(selectors):
+            if profiles is not None and act.profile not in profiles:
+                if selectors:
+                    print(f"Skipping {act.key}: profile {act.profile} is not handled here")
+                continue
+            try:
+                path = self.resolve(act)
+            except ValueError as e:
+                print(f"Skipping {act.key}: {e}")
+                continue
+            if path is None:
+                print(f"Skipping {act.key}: no file matching {act.file} in {self.pdf_dir}")
+                continue
+            act.path = path
+            if verify and act.sha256 and act.checksum() != act.sha256:
+                raise ChecksumMismatch(f"{path} does not match the checksum pinned for {act.key} "
+                                 f"(run act_registry.py pin --act {act.key} after checking the new file)")
+            yield act
+
+    def discover(self, pattern="*.pdf"):
+        """Files in pdf_dir matching pattern that no act (or ignore entry) claims."""
+        claimed = set()
+        for file in [act.file for act in self.acts] + self.ignore:
+            claimed.update(os.path.abspath(p) for p in glob.glob(os.path.join(self.pdf_dir, file)))
+        return [p for p in sorted(glob.glob(os.path.join(self.pdf_dir, pattern)))
+                if os.path.abspath(p) not in claimed]
+
+    def pin(self, selectors=None):
+        """Records the current checksum of the selected acts' files; returns the acts that changed."""
+        changed = []
+        for act in self.work_items(selectors, verify=False):
+            if act.checksum() != act.sha256:
+                act.sha256 = act.checksum()
+                changed.append(act)
+        return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the act registry.")
+    parser.add_argument("--registry", default=REGISTRY_FILE)
+    parser.add_argument("--pdf-dir", help="Directory holding the act PDFs (default: pdf_dir in the registry).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    listing = sub.add_parser("list", help="Show every act, its profile and whether its file is present and unchanged.")
+    listing.add_argument("--act", action="append", help="Act key or name (can be given several times).")
+    sub.add_parser("discover", help="List PDFs in the directory that no act claims.")
+    pin = sub.add_parser("pin", help="Record the current checksum of the acts' files.")
+    pin.add_argument("--act", action="append", help="Act key or name (can be given several times).")
+    args = parser.parse_args()
+
+    registry = ActRegistry.load(args.registry, args.pdf_dir)
+    if args.command == "list":
+        for act in registry.select(args.act):
+            try:
+                path = registry.resolve(act)
+            except ValueError as e:
+                path, status = None, str(e)
+            else:
+                act.path = path
+                if path is None:
+                    status = "missing"
+                elif act.sha256 is None:
+                    status = "not pinned"
+                else:
+                    status = "ok" if act.checksum() == act.sha256 else "CHANGED"
+            print(f"{act.key:10s} {act.profile:12s} {status:10s} {act.name} <- {path or act.file}")
+    elif args.command == "discover":
+        for path in registry.discover():
+            print(path)
+    else:
+        changed = registry.pin(args.act)
+        registry.save(args.registry)
+        for act in changed:
+            print(f"Pinned {act.key}: {act.sha256}")
+        print(f"{len(changed)} checksum(s) updated in {args.registry}")
+
+if __name__ == "__main__":
+    main()
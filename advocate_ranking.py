@@ -0,0 +1,302 @@
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+
+# Configuration
+ADVOCATES_FILE = "indian_advocates_case_history_dataset.csv"
+RANKING_FILE = "advocate_ranking.json"
+RANKING_VERSION = 1
+TOP_K = 25
+
+# Groups are keyed by these columns, with "*" for "any".
+DIMENSIONS = ("Specialization", "State", "City", "Primary_Court_Level")
+WILDCARD = "*"
+# Which dimensions each group pattern keeps. City only makes sense within a state.
+GROUP_PATTERNS = [
+    (specialization, state, city, level)
+    for specialization in (True, False)
+    for state in (True, False)
+    for city in ((True, False) if state else (False,))
+    for level in (True, False)
+]
+# Running sums per group, so appended rows update the aggregates in O(1)
+STAT_FIELDS = ("count", "handled", "won", "win_rate_sum", "duration_sum",
+               "duration_min", "duration_max", "rating_sum", "experience_sum")
+
+def advocate_record(row):
+    """The fields kept for a ranked advocate, with the derived win rate."""
+    handled = int(row["Total_Cases_Handled"] or 0)
+    won = int(row["Cases_Won"] or 0)
+    return {
+        "Advocate_ID": row["Advocate_ID"],
+        "Full_Name": row["Full_Name"],
+        "City": row["City"],
+        "State": row["State"],
+        "Primary_Court_Level": row["Primary_Court_Level"],
+        "Court_Name": row["Court_Name"],
+        "Specialization": row["Specialization"],
+        "Years_of_Experience": int(row["Years_of_Experience"] or 0),
+        "Total_Cases_Handled": handled,
+        "Cases_Won": won,
+        "Win_Rate": round(won / handled, 4) if handled else 0.0,
+        "Average_Case_Duration_Months": int(row["Average_Case_Duration_Months"] or 0),
+        "Client_Rating_Out_of_5": float(row["Client_Rating_Out_of_5"] or 0)
+    }
+
+def rank_key(record):
+    """Best first: win rate, then rating, then shorter cases, then experience."""
+    return (-record["Win_Rate"], -record["Client_Rating_Out_of_5"], record["Average_Case_Duration_Months"],
+            -record["Years_of_Experience"], record["Advocate_ID"])
+
+def group_key(values):
+    return "|".join(values)
+
+def group_keys(record):
+    for pattern in GROUP_PATTERNS:
+        yield group_key([record[d] if keep else WILDCARD for d, keep in zip(DIMENSIONS, pattern)])
+
+def empty_stats():
+    return [0, 0, 0, 0.0, 0, None, None, 0.0, 0]
+
+def add_to_stats(stats, record):
+    duration = record["Average_Case_Duration_Months"]
+    stats[0] += 1
+    stats[1] += record["Total_Cases_Handled"]
+    stats[2] += record["Cases_Won"]
+    stats[3] += record["Win_Rate"]
+    stats[4] += duration
+    stats[5] = duration if stats[5] is None else min(stats[5], duration)
+    stats[6] = duration if stats[6] is None else max(stats[6], duration)
+    stats[7] += record["Client_Rating_Out_of_5"]
+    stats[8] += record["Years_of_Experience"]
+
+def summarize_stats(stats):
+    s = dict(zip(STAT_FIELDS, stats))
+    n = s["count"] or 1
+    return {
+        "Advocates": s["count"],
+        "Pooled_Win_Rate": round(s["won"] / s["handled"], 4) if s["handled"] else 0.0,
+        "Mean_Win_Rate": round(s["win_rate_sum"] / n, 4),
+        "Mean_Case_Duration_Months": round(s["duration_sum"] / n, 2),
+        "Min_Case_Duration_Months": s["duration_min"],
+        "Max_Case_Duration_Months": s["duration_max"],
+        "Mean_Client_Rating": round(s["rating_sum"] / n, 3),
+        "Mean_Years_of_Experience": round(s["experience_sum"] / n, 2)
+    }
+
+def read_csv_tail(path, offset):
+    """
+    (rows, end offset) for the complete records from byte offset on. A row
+    still being written (no newline yet, or inside a quoted field) is left
+    for the next read.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        if offset < len(header):
+            offset = len(header)
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    while data.count(b'"', 0, end) % 2:
+        end = data.rfind(b'\n', 0, end - 1) + 1
+    data = data[:end]
+    fieldnames = next(csv.reader([header.decode('utf-8')]))
+    text = io.StringIO(data.decode('utf-8'), newline=None)
+    return list(csv.DictReader(text, fieldnames=fieldnames)), offset + len(data)
+
+def prefix_digest(path, length):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+class AdvocateRanking:
+    """
+    Precomputed advocate recommendations: for every group pattern over
+    (Specialization, State, City, Court_Level) the TOP_K best advocates
+    (see rank_key) and running aggregates. Recommending is a dict lookup.
+    The index remembers how much of the CSV it has read and can take in
+    rows appended since, as long as the earlier bytes did not change.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        if data and data.get("version") != RANKING_VERSION:
+            raise ValueError(f"Unsupported ranking version: {data.get('version')}")
+        self.source = data.get("source")
+        self.source_bytes = data.get("source_bytes", 0)
+        self.prefix_sha256 = data.get("prefix_sha256")
+        self.top_k = data.get("top_k", TOP_K)
+        self.advocates = data.get("advocates", {})
+        self.groups = data.get("groups", {})
+
+    @classmethod
+    def load(cls, path=RANKING_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def build(cls, source=ADVOCATES_FILE, top_k=TOP_K):
+        ranking = cls({"version": RANKING_VERSION, "source": source, "top_k": top_k})
+        ranking.update()
+        return ranking
+
+    def add(self, rows):
+        """Adds advocate rows; returns how many were new (already indexed IDs are skipped)."""
+        touched = {}
+        added = 0
+        for row in rows:
+            record = advocate_record(row)
+            if record["Advocate_ID"] in self.advocates:
+                continue
+            self.advocates[record["Advocate_ID"]] = record
+            added += 1
+            for key in group_keys(record):
+                group = self.groups.get(key)
+                if group is None:
+                    group = self.groups[key] = {"stats": empty_stats(), "top": []}
+                add_to_stats(group["stats"], record)
+                group["top"].append(record["Advocate_ID"])
+                touched[key] = group
+        for group in touched.values():
+            group["top"] = sorted(set(group["top"]), key=lambda i: rank_key(self.advocates[i]))[:self.top_k]
+        return added
+
+    def update(self):
+        """
+        Reads rows appended to the source since the last build or update.
+        Falls back to a full rebuild if the already indexed bytes changed.
+        Returns the number of advocates added.
+        """
+        size = os.path.getsize(self.source)
+        if self.source_bytes and (size < self.source_bytes or
+                                  prefix_digest(self.source, self.source_bytes) != self.prefix_sha256):
+            print(f"{self.source} changed before byte {self.source_bytes}; rebuilding the ranking")
+            self.source_bytes = 0
+            self.advocates = {}
+            self.groups = {}
+        if size == self.source_bytes:
+            return 0
+        rows, self.source_bytes = read_csv_tail(self.source, self.source_bytes)
+        added = self.add(rows)
+        self.prefix_sha256 = prefix_digest(self.source, self.source_bytes)
+        return added
+
+    def save(self, path=RANKING_FILE):
+        data = {
+            "version": RANKING_VERSION,
+            "source": self.source,
+            "source_bytes": self.source_bytes,
+            "prefix_sha256": self.prefix_sha256,
+            "top_k": self.top_k,
+            "advocates": self.advocates,
+            "groups": self.groups
+        }
+        with open(path + ".partial", 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(path + ".partial", path)
+
+    def group(self, specialization=None, state=None, city=None, court_level=None):
+        if city and not state:
+            raise ValueError("City needs a State")
+        return self.groups.get(group_key([v or WILDCARD for v in (specialization, state, city, court_level)]))
+
+    def recommend(self, specialization=None, state=None, city=None, court_level=None, k=5):
+        """
+        Up to k advocates for the most specific group, topped up from broader
+        groups (dropping City, then Court_Level, then State) if it is short.
+        """
+        wanted = [(specialization, state, city, court_level), (specialization, state, None, court_level),
+                  (specialization, state, None, None), (specialization, None, None, None)]
+        results = []
+        seen = set()
+        for values in wanted:
+            group = self.group(*values)
+            if group is None:
+                continue
+            for advocate_id in group["top"]:
+                if advocate_id not in seen:
+                    seen.add(advocate_id)
+                    results.append(self.advocates[advocate_id])
+                    if len(results) == k:
+                        return results
+        return results
+
+    def stats(self, specialization=None, state=None, city=None, court_level=None):
+        group = self.group(specialization, state, city, court_level)
+        return summarize_stats(group["stats"]) if group else None
+
+def load_or_build(path=RANKING_FILE, source=ADVOCATES_FILE):
+    """Loads the saved ranking and takes in appended rows, or builds it from scratch."""
+    ranking = AdvocateRanking.load(path) if os.path.exists(path) else None
+    if ranking is None or ranking.source != source:
+        ranking = AdvocateRanking.build(source)
+        ranking.save(path)
+    elif ranking.update():
+        ranking.save(path)
+    return ranking
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed advocate rankings and aggregates.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the ranking from scratch.")
+    build.add_argument("--csv", default=ADVOCATES_FILE)
+    build.add_argument("--ranking", default=RANKING_FILE)
+    build.add_argument("--top-k", type=int, default=TOP_K, help="Advocates kept per group.")
+
+    update = sub.add_parser("update", help="Take in rows appended to the CSV since the last run.")
+    update.add_argument("--ranking", default=RANKING_FILE)
+
+    recommend = sub.add_parser("recommend", help="Best advocates and aggregates for a group.")
+    recommend.add_argument("--ranking", default=RANKING_FILE)
+    recommend.add_argument("--specialization")
+    recommend.add_argument("--state")
+    recommend.add_argument("--city")
+    recommend.add_argument("--court-level")
+    recommend.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "build":
+        ranking = AdvocateRanking.build(args.csv, args.top_k)
+        ranking.save(args.ranking)
+        print(f"Ranked {len(ranking.advocates)} advocates into {len(ranking.groups)} groups "
+              f"in {time.perf_counter() - t0:.2f}s, saved to {args.ranking}")
+        return
+
+    ranking = AdvocateRanking.load(args.ranking)
+    if args.command == "update":
+        added = ranking.update()
+        ranking.save(args.ranking)
+        print(f"Added {added} advocates in {time.perf_counter() - t0:.2f}s, "
+              f"{len(ranking.groups)} groups, saved to {args.ranking}")
+        return
+
+    t1 = time.perf_counter()
+    values = (args.specialization, args.state, args.city, args.court_level)
+    advocates = ranking.recommend(*values, k=args.k)
+    stats = ranking.stats(*values)
+    t2 = time.perf_counter()
+    for rank, a in enumerate(advocates, 1):
+        print(f"{rank}. {a['Full_Name']} ({a['Advocate_ID']}) - {a['Specialization']}, {a['City']}, {a['State']}, "
+              f"{a['Primary_Court_Level']}: win rate {a['Win_Rate']:.2%}, rating {a['Client_Rating_Out_of_5']}, "
+              f"{a['Average_Case_Duration_Months']} months avg")
+    if stats:
+        print(json.dumps(stats, indent=4))
+    print(f"Loaded ranking in {(t1 - t0) * 1000:.1f} ms, lookup took {(t2 - t1) * 1000:.3f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
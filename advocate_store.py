@@ -0,0 +1,438 @@
+
+import os
+import sys
+import csv
+import json
+import mmap
+import time
+import heapq
+import random
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from pdf_cache import file_digest
+
+# Configuration
+ADVOCATES_FILE = "indian_advocates_case_history_dataset.csv"
+STORE_FILE = "advocates.col"
+STORE_MAGIC = b"ADVCOL01"
+STORE_VERSION = 1
+ALIGN = 8
+
+# Column kinds:
+# "text"  - free text (IDs, names): utf-8 blob + row offsets, decoded on access
+# "dict"  - dictionary-encoded strings: one small integer code per row, plus the
+#           rows grouped by code so an equality filter is a slice, not a scan
+# "int" / "float" - numeric arrays, plus the row order sorted by value
+SCHEMA = [
+    ("Advocate_ID", "text"),
+    ("Full_Name", "text"),
+    ("Bar_Council_Enrollment_Number", "text"),
+    ("City", "dict"),
+    ("State", "dict"),
+    ("Primary_Court_Level", "dict"),
+    ("Court_Name", "dict"),
+    ("Specialization", "dict"),
+    ("Years_of_Experience", "int"),
+    ("Total_Cases_Handled", "int"),
+    ("Cases_Won", "int"),
+    ("Cases_Lost", "int"),
+    ("Recent_Indian_Case_Type", "dict"),
+    ("Average_Case_Duration_Months", "int"),
+    ("Client_Rating_Out_of_5", "float")
+]
+# Derived at build time so that queries can filter and sort on it directly
+DERIVED = [("Win_Rate", "float")]
+NUMERIC_TYPECODES = {"int": "i", "float": "d"}
+
+def win_rate(won, handled):
+    return won / handled if handled else 0.0
+
+def code_typecode(cardinality):
+    if cardinality <= 1 << 8:
+        return "B"
+    if cardinality <= 1 << 16:
+        return "H"
+    return "I"
+
+def iter_csv_rows(path=ADVOCATES_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+def synthetic_rows(n, path=ADVOCATES_FILE, seed=0):
+    """n rows resampled from the real dataset, with fresh Advocate_IDs."""
+    rng = random.Random(seed)
+    rows = list(iter_csv_rows(path))
+    for i in range(n):
+        yield dict(rng.choice(rows), Advocate_ID=f"SYNADV{i + 1:07d}")
+
+def build_store(rows, path=STORE_FILE, source=None):
+    """
+    Writes rows (dicts keyed by the SCHEMA column names) to a columnar file:
+    8-byte magic, 8-byte header length, JSON header, then 8-byte aligned
+    column blocks in native byte order. Returns the number of rows.
+    """
+    text = {name: [] for name, kind in SCHEMA if kind == "text"}
+    codes = {name: {} for name, kind in SCHEMA if kind == "dict"}
+    columns = {name: array("I") for name in codes}
+    for name, kind in SCHEMA + DERIVED:
+        if kind in NUMERIC_TYPECODES:
+            columns[name] = array(NUMERIC_TYPECODES[kind])
+
+    n = 0
+    for row in rows:
+        for name, kind in SCHEMA:
+            raw = (row.get(name) or "").strip()
+            if kind == "text":
+                text[name].append(raw)
+            elif kind == "dict":
+                columns[name].append(codes[name].setdefault(raw, len(codes[name])))
+            elif kind == "int":
+                columns[name].append(int(raw or 0))
+            else:
+                columns[name].append(float(raw or 0))
+        columns["Win_Rate"].append(win_rate(columns["Cases_Won"][-1], columns["Total_Cases_Handled"][-1]))
+        n += 1
+
+    blocks = []
+    size = 0
+    def add_block(data):
+        nonlocal size
+        blocks.append(data)
+        offset = size
+        size += len(data)
+        pad = -size % ALIGN
+        if pad:
+            blocks.append(b"\0" * pad)
+            size += pad
+        return [offset, len(data)]
+
+    meta = {}
+    for name, kind in SCHEMA + DERIVED:
+        if kind == "text":
+            encoded = [value.encode('utf-8') for value in text[name]]
+            offsets = array("Q", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            meta[name] = {"kind": kind, "offsets": add_block(offsets.tobytes()), "blob": add_block(b"".join(encoded))}
+        elif kind == "dict":
+            values = list(codes[name])
+            data = columns[name]
+            grouped = sorted(range(n), key=data.__getitem__)
+            starts = [0] * (len(values) + 1)
+            for code in data:
+                starts[code + 1] += 1
+            for code in range(len(values)):
+                starts[code + 1] += starts[code]
+            typecode = code_typecode(len(values))
+            meta[name] = {"kind": kind, "typecode": typecode, "values": values, "starts": starts,
+                          "data": add_block(array(typecode, data).tobytes()),
+                          "grouped": add_block(array("I", grouped).tobytes())}
+        else:
+            data = columns[name]
+            order = sorted(range(n), key=data.__getitem__)
+            meta[name] = {"kind": kind, "typecode": data.typecode, "data": add_block(data.tobytes()),
+                          "order": add_block(array("I", order).tobytes())}
+
+    header = json.dumps({
+        "version": STORE_VERSION,
+        "byteorder": sys.byteorder,
+        "rows": n,
+        "source": source,
+        "source_sha256": file_digest(source) if source else None,
+        "columns": meta
+    }, ensure_ascii=False).encode('utf-8')
+    header += b" " * (-(len(STORE_MAGIC) + 8 + len(header)) % ALIGN)
+
+    with open(path, 'wb') as f:
+        f.write(STORE_MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    return n
+
+def filter_rows(rows, checks, ranges):
+    """Column-at-a-time filter (most selective check first); returns a list."""
+    for data, wanted in checks:
+        if len(wanted) == 1:
+            (code,) = wanted
+            rows = [r for r in rows if data[r] == code]
+        else:
+            rows = [r for r in rows if data[r] in wanted]
+    for data, lo, hi in ranges:
+        rows = [r for r in rows if lo <= data[r] <= hi]
+    return rows if isinstance(rows, list) else list(rows)
+
+class AdvocateStore:
+    """
+    Read-only view of a columnar advocates file. Opening it maps the file and
+    parses only the JSON header; column data stays in the page cache and
+    rows are only turned into dicts for the results a caller asks for.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(STORE_MAGIC)] != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an advocates column store")
+        start = len(STORE_MAGIC) + 8
+        header_len = int.from_bytes(self.mm[len(STORE_MAGIC):start], 'little')
+        header = json.loads(self.mm[start:start + header_len].decode('utf-8'))
+        if header.get("version") != STORE_VERSION or header.get("byteorder") != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written by an incompatible version or machine; rebuild it")
+
+        self.rows = header["rows"]
+        self.source = header.get("source")
+        self.source_sha256 = header.get("source_sha256")
+        self.meta = header["columns"]
+        self.views = []
+        self.base = start + header_len
+        self.data = {}
+        self.order = {}
+        self.grouped = {}
+        self.codes = {}
+        for name, meta in self.meta.items():
+            if meta["kind"] == "text":
+                self.data[name] = (self._view(meta["offsets"], "Q"), self._view(meta["blob"], "B"))
+                continue
+            self.data[name] = self._view(meta["data"], meta["typecode"])
+            if meta["kind"] == "dict":
+                self.grouped[name] = self._view(meta["grouped"], "I")
+                self.codes[name] = {value: code for code, value in enumerate(meta["values"])}
+            else:
+                self.order[name] = self._view(meta["order"], "I")
+
+    def _view(self, block, typecode):
+        offset, length = block
+        view = memoryview(self.mm)[self.base + offset:self.base + offset + length].cast(typecode)
+        self.views.append(view)
+        return view
+
+    def __len__(self):
+        return self.rows
+
+    def kind(self, name):
+        if name not in self.meta:
+            raise ValueError(f"Unknown column: {name}")
+        return self.meta[name]["kind"]
+
+    def value(self, name, row):
+        kind = self.kind(name)
+        if kind == "text":
+            offsets, blob = self.data[name]
+            return bytes(blob[offsets[row]:offsets[row + 1]]).decode('utf-8')
+        if kind == "dict":
+            return self.meta[name]["values"][self.data[name][row]]
+        return self.data[name][row]
+
+    def row(self, row, columns=None):
+        return {name: self.value(name, row) for name in (columns or self.meta)}
+
+    def rows_with(self, name, value):
+        """Row ids (in file order) whose dictionary column equals value."""
+        code = self.codes[name].get(value)
+        if code is None:
+            return self.grouped[name][0:0]
+        starts = self.meta[name]["starts"]
+        return self.grouped[name][starts[code]:starts[code + 1]]
+
+    def rows_between(self, name, lo, hi):
+        """Row ids (in value order) whose numeric column lies in [lo, hi], found by bisecting the sort order."""
+        order = self.order[name]
+        key = self.data[name].__getitem__
+        start = 0 if lo == float("-inf") else bisect_left(order, lo, key=key)
+        end = self.rows if hi == float("inf") else bisect_right(order, hi, key=key)
+        return order[start:max(start, end)]
+
+    def query(self, where=None, order_by=None, descending=False, limit=None):
+        """
+        Returns row ids matching where, optionally sorted and cut to limit.
+        where maps a dict column to a value or a list of values, or a numeric
+        column to an inclusive (lo, hi) range where either end may be None.
+        Ties keep file order for ascending sorts, reverse file order for
+        descending ones.
+
+        Every filter's matching rows are known without a scan: a slice of
+        the grouped rows per dictionary value, a bisected slice of the sort
+        order per range. Two plans: take the rows of the filter with the
+        fewest matches and check the other filters on those only, or, when
+        a limit is given and the filters are not too selective, walk the
+        precomputed sort order (or file order) until limit rows have matched.
+        """
+        filters = []        # (matching rows, their row-id slices, equality checks, ranges), one per column
+        for name, cond in (where or {}).items():
+            kind = self.kind(name)
+            if kind == "dict":
+                wanted = [cond] if isinstance(cond, str) else list(cond)
+                codes = {self.codes[name][v] for v in wanted if v in self.codes[name]}
+                starts = self.meta[name]["starts"]
+                grouped = self.grouped[name]
+                slices = [grouped[starts[c]:starts[c + 1]] for c in sorted(codes)]
+                filters.append((sum(len(rows) for rows in slices), slices, [(self.data[name], codes)], []))
+            elif kind in NUMERIC_TYPECODES:
+                lo, hi = cond
+                lo = float("-inf") if lo is None else lo
+                hi = float("inf") if hi is None else hi
+                rows = self.rows_between(name, lo, hi)
+                filters.append((len(rows), [rows], [], [(self.data[name], lo, hi)]))
+            else:
+                raise ValueError(f"Cannot filter on text column {name}")
+        if order_by is not None and self.kind(order_by) not in NUMERIC_TYPECODES:
+            raise ValueError(f"Can only sort on numeric columns, not {order_by}")
+        filters.sort(key=lambda f: f[0])
+        if filters and filters[0][0] == 0:
+            return []
+
+        selectivity = 1.0
+        for count, _, _, _ in filters:
+            selectivity *= count / self.rows
+        scan_cost = filters[0][0] if filters else self.rows
+        if limit is not None and limit / selectivity < scan_cost:
+            checks = [check for f in filters for check in f[2]]
+            ranges = [r for f in filters for r in f[3]]
+            order = range(self.rows) if order_by is None else self.order[order_by]
+            return self._walk(order, order_by is not None and descending, limit, checks, ranges,
+                              int(limit / selectivity))
+
+        if filters:
+            _, slices, _, _ = filters[0]
+            checks = [check for f in filters[1:] for check in f[2]]
+            ranges = [r for f in filters[1:] for r in f[3]]
+            rows = []
+            for candidates in slices:
+                rows.extend(filter_rows(candidates, checks, ranges))
+            if len(slices) > 1 or filters[0][3]:
+                rows.sort()     # back to file order: the candidates came in value order
+        else:
+            rows = list(range(self.rows))
+
+        if order_by is None:
+            return rows[:limit]
+        keys = self.data[order_by]
+        if descending:
+            rows.reverse()
+            if limit is not None:
+                return heapq.nlargest(limit, rows, key=keys.__getitem__)
+        elif limit is not None:
+            return heapq.nsmallest(limit, rows, key=keys.__getitem__)
+        return sorted(rows, key=keys.__getitem__, reverse=descending)
+
+    def _walk(self, order, descending, limit, checks, ranges, expected):
+        """Filters rows in the given order block by block until limit rows match."""
+        found = []
+        block = max(64, expected + expected // 2)
+        pos = 0
+        while pos < self.rows and len(found) < limit:
+            if descending:
+                rows = order[max(0, self.rows - pos - block):self.rows - pos][::-1]
+            else:
+                rows = order[pos:pos + block]
+            found.extend(filter_rows(rows, checks, ranges))
+            pos += block
+            block *= 2
+        return found[:limit]
+
+    def close(self):
+        for view in getattr(self, "views", []):
+            view.release()
+        self.views = []
+        self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def open_store(path=STORE_FILE, source=None):
+    """
+    Opens the store, building it first from source (default: the CSV it was
+    built from, else ADVOCATES_FILE) if it is missing, was written by an
+    older version, or that CSV has changed since. Stores built without a
+    source (--synthetic) are used as they are unless source is given.
+    """
+    store = None
+    if os.path.exists(path):
+        try:
+            store = AdvocateStore(path)
+        except ValueError:
+            pass
+    if store is not None:
+        source = source or store.source
+        if source is None:
+            return store
+        if not os.path.exists(source):
+            print(f"Warning: {source} is missing; using {path} as it is", file=sys.stderr)
+            return store
+        if store.source == source and store.source_sha256 == file_digest(source):
+            return store
+        store.close()
+        print(f"{path} is out of date with {source}; rebuilding it", file=sys.stderr)
+    source = source or ADVOCATES_FILE
+    build_store(iter_csv_rows(source), path, source=source)
+    return AdvocateStore(path)
+
+def parse_condition(text, ranged=False):
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected COLUMN=VALUE, got {text!r}")
+    if ranged:
+        lo, _, hi = value.partition(":")
+        return name, (float(lo) if lo else None, float(hi) if hi else None)
+    values = value.split("|")
+    return name, values[0] if len(values) == 1 else values
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar, memory-mapped store for the advocates dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Convert the advocates CSV into a column store.")
+    build.add_argument("--csv", default=ADVOCATES_FILE)
+    build.add_argument("--store", default=STORE_FILE)
+    build.add_argument("--synthetic", type=int, default=0,
+                       help="Build from this many rows resampled from the CSV instead (for benchmarks).")
+
+    query = sub.add_parser("query", help="Filter, sort and take the top rows.")
+    query.add_argument("--store", default=STORE_FILE)
+    query.add_argument("--csv", help="CSV the store must be current with (default: the one it was built from); "
+                                     "the store is rebuilt if it changed.")
+    query.add_argument("--where", action="append", default=[], type=parse_condition,
+                       help="COLUMN=VALUE equality filter on a text-category column; VALUE may be a|b|c.")
+    query.add_argument("--range", action="append", default=[], type=lambda t: parse_condition(t, ranged=True),
+                       help="COLUMN=LO:HI inclusive range filter on a numeric column; either end may be empty.")
+    query.add_argument("--order-by", help="Numeric column to sort on (e.g. Win_Rate).")
+    query.add_argument("--asc", action="store_true", help="Sort ascending (default is descending).")
+    query.add_argument("--limit", type=int, default=10)
+    query.add_argument("--columns", default="Advocate_ID,Full_Name,City,State,Specialization,Win_Rate,Client_Rating_Out_of_5",
+                       help="Comma-separated columns to print.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        if args.synthetic:
+            n = build_store(synthetic_rows(args.synthetic, args.csv), args.store)
+        else:
+            n = build_store(iter_csv_rows(args.csv), args.store, source=args.csv)
+        print(f"Wrote {n} rows to {args.store} in {time.perf_counter() - t0:.2f}s")
+        return
+
+    t0 = time.perf_counter()
+    store = open_store(args.store, args.csv)
+    t1 = time.perf_counter()
+    with store:
+        rows = store.query(dict(args.where + args.range), args.order_by, not args.asc, args.limit)
+        t2 = time.perf_counter()
+        columns = args.columns.split(",")
+        for row in rows:
+            print(json.dumps(store.row(row, columns), ensure_ascii=False))
+    print(f"Opened {len(store)} rows in {(t1 - t0) * 1000:.2f} ms, query took {(t2 - t1) * 1000:.3f} ms "
+          f"({len(rows)} result(s))", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
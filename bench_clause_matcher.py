@@ -0,0 +1,75 @@
+
+import json
+import re
+import time
+import argparse
+from extract_legal_data import CLAUSE_MATCHER
+
+# Configuration
+INPUT_FILE = "legal_data.json"
+
+# The per-pattern penalty/relief search that extract_section_data used before
+# ClauseMatcher, kept here as the reference implementation.
+LEGACY_PENALTY_PATTERNS = [
+    r'(shall be punished with.*?)(\.|;|$)',
+    r'(punishable with.*?)(\.|;|$)',
+    r'(imprisonment for.*?)(\.|;|$)',
+    r'(fine which may extend.*?)(\.|;|$)'
+]
+
+LEGACY_RELIEF_PATTERNS = [
+    r'(fail to pay.*?)(?:\.|;|$)',
+    r'(compensation.*?)(?:\.|;|$)',
+    r'(refund.*?)(?:\.|;|$)',
+    r'(damages.*?)(?:\.|;|$)',
+    r'(restore.*?)(?:\.|;|$)',
+    r'(reimburse.*?)(?:\.|;|$)'
+]
+
+def legacy_longest(patterns, content):
+    best = ""
+    for pat in patterns:
+        match = re.search(pat, content, re.IGNORECASE)
+        if match:
+            text = match.group(1).strip()
+            if len(text) > len(best):
+                best = text
+    return best
+
+def legacy_clauses(content):
+    return legacy_longest(LEGACY_PENALTY_PATTERNS, content), legacy_longest(LEGACY_RELIEF_PATTERNS, content)
+
+def matcher_clauses(content):
+    clauses = CLAUSE_MATCHER.match(content)
+    return clauses["Penalty"], clauses["Relief"]
+
+def best_time(func, contents, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for content in contents:
+            func(content)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ClauseMatcher against the per-pattern regex search.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Extractor output whose sections are used as input.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        contents = [entry["Applicable_Scenario"] for entry in json.load(f)]
+
+    mismatches = sum(1 for c in contents if legacy_clauses(c) != matcher_clauses(c))
+    print(f"Sections: {len(contents)}, mismatches: {mismatches}")
+
+    legacy = best_time(legacy_clauses, contents, args.repeat)
+    matcher = best_time(matcher_clauses, contents, args.repeat)
+    print(f"Per-pattern re.search: {legacy * 1000:.1f} ms ({len(contents) / legacy:,.0f} sections/s)")
+    print(f"ClauseMatcher:         {matcher * 1000:.1f} ms ({len(contents) / matcher:,.0f} sections/s)")
+    print(f"Speedup: {legacy / matcher:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+
+import os
+import sys
+import csv
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from datetime import datetime, timezone
+from pdf_cache import PageTextCache
+from act_registry import REGISTRY_FILE, ActRegistry
+from extract_legal_data import SECTION_PATTERNS, clean_text, extract_section_data, iter_sections
+from extract_crime_data import map_article_to_legal_issue
+from extract_templates import extract_bnss_forms, extract_bnss_targeted
+
+# Configuration
+CRIME_FILE = "7k  Unique crime articles.csv"
+BNSS_ACT = "BNSS"
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.15
+
+# Benchmarks of the extractors' hot functions. Each one loads its input once
+# (not timed) and returns a run function that processes it and returns the
+# number of items produced or consumed. At scale N the input is repeated N
+# times, which keeps its shape but shows up anything worse than linear.
+
+def load_act_pages(registry, cache):
+    return [(act.name, cache.page_texts(act.path, digest=act.digest))
+            for act in registry.work_items(profiles=SECTION_PATTERNS)]
+
+def load_crime_rows(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return [(row.get('heading', '').strip(), row.get('content_summary', '').strip())
+                for row in csv.DictReader(f)]
+
+def bench_clean_text(inputs, scale):
+    texts = ["\n".join(pages) * scale for _, pages in inputs["acts"]]
+    def run():
+        for text in texts:
+            clean_text(text)
+        return sum(len(pages) for _, pages in inputs["acts"]) * scale
+    return run, "pages", sum(len(t) for t in texts)
+
+def bench_extract_section_data(inputs, scale):
+    texts = [(act_name, clean_text("\n".join(pages * scale))) for act_name, pages in inputs["acts"]]
+    def run():
+        return sum(len(extract_section_data(text, act_name)) for act_name, text in texts)
+    return run, "sections", sum(len(t) for _, t in texts)
+
+def bench_iter_sections(inputs, scale):
+    acts = [(act_name, pages * scale) for act_name, pages in inputs["acts"]]
+    def run():
+        return sum(sum(1 for _ in iter_sections(pages, act_name)) for act_name, pages in acts)
+    return run, "sections", sum(len(p) for _, pages in acts for p in pages)
+
+def bench_map_article_to_legal_issue(inputs, scale):
+    rows = inputs["crime_rows"] * scale
+    def run():
+        for heading, summary in rows:
+            map_article_to_legal_issue(heading, summary)
+        return len(rows)
+    return run, "rows", sum(len(h) + len(s) for h, s in rows)
+
+def bench_extract_bnss_forms(inputs, scale):
+    # The whole function, with the page text coming from the warm cache; scale
+    # repeats the whole call (forms are keyed by name, so repeating the text
+    # inside one call would not find more of them)
+    path = inputs["bnss_path"]
+    def run():
+        return sum(len(extract_bnss_forms(path, inputs["cache"])[1]) for _ in range(scale))
+    return run, "forms", len(inputs["bnss_text"]) * scale
+
+def bench_extract_bnss_targeted(inputs, scale):
+    # Located pages only; scale repeats the whole call
+    path = inputs["bnss_path"]
+    def run():
+        return sum(len(extract_bnss_targeted(path, inputs["cache"])[0]) for _ in range(scale))
+    return run, "forms", len(inputs["bnss_text"]) * scale
+
+BENCHMARKS = [
+    ("clean_text", bench_clean_text, "acts"),
+    ("extract_section_data", bench_extract_section_data, "acts"),
+    ("iter_sections", bench_iter_sections, "acts"),
+    ("map_article_to_legal_issue", bench_map_article_to_legal_issue, "crime_rows"),
+    ("extract_bnss_forms", bench_extract_bnss_forms, "bnss_text"),
+    ("extract_bnss_targeted", bench_extract_bnss_targeted, "bnss_text"),
+]
+
+def load_inputs(registry, crime_file):
+    """Reads every input once; missing files leave their benchmarks out."""
+    cache = PageTextCache()
+    inputs = {"cache": cache}
+    t0 = time.perf_counter()
+    acts = load_act_pages(registry, cache)
+    if acts:
+        inputs["acts"] = acts
+    if os.path.exists(crime_file):
+        inputs["crime_rows"] = load_crime_rows(crime_file)
+    for bnss in registry.work_items([BNSS_ACT]):
+        inputs["bnss_path"] = bnss.path
+        inputs["bnss_text"] = "".join(text + "\n" for text in cache.page_texts(bnss.path))
+    print(f"Loaded inputs in {time.perf_counter() - t0:.2f}s ({cache.summary()})")
+    return inputs
+
+def measure(run, repeat):
+    """(best wall time, items, peak traced bytes). Memory is traced in a separate run."""
+    best = None
+    items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        items = run()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, items, peak
+
+def run_benchmarks(inputs, scales, repeat, only=None):
+    results = {}
+    for name, bench, needs in BENCHMARKS:
+        if only and not any(o in name for o in only):
+            continue
+        if needs not in inputs:
+            print(f"Skipping {name}: input not found")
+            continue
+        for scale in scales:
+            key = f"{name}@x{scale}"
+            run, unit, input_chars = bench(inputs, scale)
+            seconds, items, peak = measure(run, repeat)
+            results[key] = {
+                "seconds": round(seconds, 6),
+                "items": items,
+                "unit": unit,
+                "items_per_s": round(items / seconds, 1) if seconds else None,
+                "input_mb_per_s": round(input_chars / seconds / 1e6, 3) if seconds else None,
+                "peak_mib": round(peak / (1 << 20), 3)
+            }
+            r = results[key]
+            print(f"  {key:34s} {seconds * 1000:10.1f} ms {r['items_per_s']:>12,.0f} {unit}/s "
+                  f"{r['input_mb_per_s']:8.2f} MB/s {r['peak_mib']:9.2f} MiB peak")
+    return results
+
+def compare(results, baseline, threshold, memory_threshold):
+    """Prints each result against the baseline; returns the names that regressed."""
+    regressions = []
+    print(f"\nAgainst baseline from {baseline.get('created', '?')} "
+          f"(time threshold +{threshold:.0%}, memory threshold +{memory_threshold:.0%}):")
+    for key, r in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"  {key:34s} (no baseline)")
+            continue
+        time_change = r["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+        memory_change = r["peak_mib"] / base["peak_mib"] - 1 if base["peak_mib"] else 0.0
+        flags = []
+        if time_change > threshold:
+            flags.append("SLOWER")
+        if memory_change > memory_threshold:
+            flags.append("MORE MEMORY")
+        if r["items"] != base["items"]:
+            flags.append(f"ITEMS {base['items']} -> {r['items']}")
+        if flags:
+            regressions.append(key)
+        print(f"  {key:34s} time {time_change:+7.1%}  memory {memory_change:+7.1%}  {' '.join(flags) or 'ok'}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractors' hot functions and compare to a baseline.")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="Act registry listing the act PDFs and the BNSS PDF.")
+    parser.add_argument("--pdf-dir", help="Directory holding the PDFs (default: pdf_dir in the registry).")
+    parser.add_argument("--crime-file", default=CRIME_FILE)
+    parser.add_argument("--scale", type=int, action="append",
+                        help="Repeat each input this many times (can be given several times; default 1).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose name contains this.")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline (merged into an existing one).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Flag benchmarks slower than the baseline by more than this fraction.")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Flag benchmarks whose peak memory grew by more than this fraction.")
+    args = parser.parse_args()
+
+    try:
+        inputs = load_inputs(ActRegistry.load(args.registry, args.pdf_dir), args.crime_file)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Running benchmarks (best of {args.repeat}):")
+    results = run_benchmarks(inputs, args.scale or [1], args.repeat, args.only)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold, args.memory_threshold)
+
+    if args.save_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                previous = json.load(f)["results"]
+        baseline = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": dict(previous, **results)
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=4)
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
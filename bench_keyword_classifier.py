@@ -0,0 +1,79 @@
+
+import csv
+import time
+import argparse
+from extract_crime_data import KEYWORD_MAP, KeywordClassifier
+
+# Configuration
+INPUT_FILE = "7k  Unique crime articles.csv"
+
+def legacy_best_rule(heading, summary):
+    """The nested keyword loop map_article_to_legal_issue used before KeywordClassifier."""
+    text = (str(heading) + " " + str(summary)).lower()
+    for mapping in KEYWORD_MAP:
+        for keyword in mapping["keywords"]:
+            if keyword in text:
+                return mapping
+    return None
+
+def legacy_scores(heading, summary):
+    """Per-category hit counts with the nested loop, for comparison with scores()."""
+    text = (str(heading) + " " + str(summary)).lower()
+    counts = {}
+    for mapping in KEYWORD_MAP:
+        for keyword in mapping["keywords"]:
+            n = text.count(keyword)
+            if n:
+                counts[mapping["Problem_Type"]] = counts.get(mapping["Problem_Type"], 0) + n
+    return counts
+
+def load_rows(path):
+    rows = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as csvfile:
+        for row in csv.DictReader(csvfile):
+            heading = row.get('heading', '').strip()
+            summary = row.get('content_summary', '').strip()
+            if heading or summary:
+                rows.append((heading, summary))
+    return rows
+
+def rows_per_second(func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for heading, summary in rows:
+            func(heading, summary)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KeywordClassifier against the nested keyword loop.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Crime articles CSV.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    rows = load_rows(args.input)
+    substring = KeywordClassifier()
+    word_start = KeywordClassifier(word_boundary=True)
+    by_score = KeywordClassifier(priority="score")
+
+    mismatches = sum(1 for h, s in rows if legacy_best_rule(h, s) is not substring.best_rule(h, s))
+    score_mismatches = sum(1 for h, s in rows if legacy_scores(h, s) != substring.scores(h, s))
+    changed = sum(1 for h, s in rows if substring.best_rule(h, s) is not word_start.best_rule(h, s))
+    print(f"Rows: {len(rows)}, first-rule mismatches: {mismatches}, score mismatches: {score_mismatches}")
+    print(f"Rows classified differently with --word-boundary: {changed}")
+
+    results = [
+        ("Nested loop, first rule", legacy_best_rule),
+        ("Classifier, first rule", substring.best_rule),
+        ("Classifier, first rule, word boundary", word_start.best_rule),
+        ("Nested loop, all scores (str.count)", legacy_scores),
+        ("Classifier, all scores", substring.scores),
+        ("Classifier, best score", by_score.best_rule),
+    ]
+    for name, func in results:
+        print(f"{name:40s} {rows_per_second(func, rows, args.repeat):>10,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
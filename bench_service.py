@@ -0,0 +1,183 @@
+
+import sys
+import csv
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlencode
+from json_output import read_records
+from legal_service import HOST, LEGAL_DATA_FILE, TEMPLATES_FILE, ADVOCATES_FILE
+from section_index import short_name
+
+# Configuration
+CASES_FILE = "test_cases.csv"
+CRIME_FILE = "7k  Unique crime articles.csv"
+CONNECTIONS = 16
+REQUESTS = 5000
+DISTINCT = 500              # distinct queries; popular ones repeat (Zipf-like), so the cache matters
+STARTUP_TIMEOUT = 120.0
+PERCENTILES = (50, 90, 99)
+
+# Load generator for legal_service.py: a fixed mix of section, classify,
+# template and advocate queries built from the local data files, sent over
+# keep-alive connections. Reports requests/s and latency percentiles.
+
+def build_queries(n, seed=0):
+    rng = random.Random(seed)
+    sections = [(short_name(r["Act_Name"]), r["Section"]) for r in read_records(LEGAL_DATA_FILE)
+                if r.get("Entry_Type", "section") == "section"]
+    with open(CRIME_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        articles = [(row.get('heading', '').strip(), row.get('content_summary', '').strip()[:300])
+                    for _, row in zip(range(2000), csv.DictReader(f))]
+    with open(CASES_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        cases = [row.get("Description", "").strip() for row in csv.DictReader(f)]
+    templates = [t["Template_Name"] for t in read_records(TEMPLATES_FILE)]
+    with open(ADVOCATES_FILE, 'r', encoding='utf-8') as f:
+        advocates = [(row["Specialization"], row["State"], row["City"], row["Primary_Court_Level"])
+                     for _, row in zip(range(2000), csv.DictReader(f))]
+
+    kinds = [("sections", 0.3), ("search", 0.1), ("classify", 0.25), ("templates", 0.1), ("advocates", 0.25)]
+    queries = []
+    for _ in range(n):
+        kind = rng.choices([k for k, _ in kinds], [w for _, w in kinds])[0]
+        if kind == "sections":
+            act, section = rng.choice(sections)
+            queries.append("/sections?" + urlencode({"act": act, "section": section}))
+        elif kind == "search":
+            queries.append("/sections?" + urlencode({"q": rng.choice(cases), "k": 5}))
+        elif kind == "classify":
+            heading, summary = rng.choice(articles)
+            queries.append("/classify?" + urlencode({"heading": heading, "summary": summary}))
+        elif kind == "templates":
+            queries.append("/templates?" + urlencode({"name": rng.choice(templates)}))
+        else:
+            spec, state, city, level = rng.choice(advocates)
+            params = rng.choice([{"specialization": spec}, {"specialization": spec, "state": state},
+                                 {"specialization": spec, "state": state, "city": city, "court_level": level}])
+            queries.append("/advocates?" + urlencode(params))
+    return queries
+
+def request_stream(queries, total, seed=0):
+    """total targets drawn from queries with weight 1/rank, in random order."""
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(len(queries))]
+    return rng.choices(queries, weights, k=total)
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length) if length else b""
+    return status, body
+
+async def client(host, port, targets, latencies, statuses):
+    """One keep-alive connection working through the shared target list."""
+    reader = writer = None
+    while targets:
+        target = targets.pop()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            t0 = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            statuses["error"] = statuses.get("error", 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def fetch_json(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+async def wait_for_server(host, port, timeout):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await fetch_json(host, port, "/health")
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+async def run(host, port, targets, connections):
+    before = (await fetch_json(host, port, "/health"))["cache"]
+    latencies = []
+    statuses = {}
+    pending = list(reversed(targets))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(host, port, pending, latencies, statuses) for _ in range(connections)))
+    elapsed = time.perf_counter() - t0
+    after = (await fetch_json(host, port, "/health"))["cache"]
+    return latencies, statuses, elapsed, before, after
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test legal_service.py on localhost.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--connections", type=int, default=CONNECTIONS)
+    parser.add_argument("--requests", type=int, default=REQUESTS)
+    parser.add_argument("--distinct", type=int, default=DISTINCT, help="Distinct queries in the mix.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-server", action="store_true",
+                        help="Start legal_service.py on --port for the run and stop it afterwards.")
+    args = parser.parse_args()
+
+    server = None
+    if args.start_server:
+        server = subprocess.Popen([sys.executable, "legal_service.py", "--host", args.host, "--port", str(args.port)])
+    try:
+        t0 = time.perf_counter()
+        asyncio.run(wait_for_server(args.host, args.port, STARTUP_TIMEOUT if server else 1.0))
+        if server:
+            print(f"Server ready in {time.perf_counter() - t0:.1f}s")
+        queries = build_queries(args.distinct, args.seed)
+        targets = request_stream(queries, args.requests, args.seed)
+        latencies, statuses, elapsed, before, after = asyncio.run(
+            run(args.host, args.port, targets, args.connections))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    print(f"{len(latencies)} responses over {args.connections} connections in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:,.0f} requests/s")
+    if latencies:
+        print("Latency: " + ", ".join(f"p{p} {percentile(latencies, p) * 1000:.2f} ms" for p in PERCENTILES)
+              + f", max {latencies[-1] * 1000:.2f} ms")
+    print(f"Statuses: {json.dumps(statuses, default=str)}")
+    if lookups:
+        print(f"Server cache: {hits / lookups:.1%} hit rate over the run ({after['entries']} entries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+
+import os
+import csv
+import json
+import time
+import random
+import argparse
+from collections import OrderedDict
+from json_output import FORMATS, RecordWriter, output_path
+from legal_search import INDEX_FILE, LegalSearchIndex, rebuild_index, tokenize
+from extract_crime_data import KeywordClassifier, DEFAULT_ENTRY
+from advocate_ranking import RANKING_FILE, load_or_build
+from section_index import SECTION_INDEX_FILE, SectionIndex, rebuild_section_index
+from pdf_cache import file_digest
+
+# Configuration
+CASES_FILE = "test_cases.csv"
+LEGAL_DATA_FILE = "legal_data.json"
+TEMPLATES_FILE = "legal_templates.json"
+ADVOCATES_FILE = "indian_advocates_case_history_dataset.csv"
+OUTPUT_FILE = "case_matches.json"
+SYNTHETIC_FILE = "synthetic_cases.csv"
+SECTION_CACHE_SIZE = 8192      # memoised section searches (least recently used ones are dropped)
+
+# Problem_Type (from KEYWORD_MAP) -> (template name prefix, advocate specialization)
+CATEGORY_ROUTES = {
+    "Employer unpaid salary/Labour dispute": ("Legal Notice Format", "Labour Law"),
+    "Financial Fraud / Cheating": ("FIR Filing Steps", "Criminal Law"),
+    "Cyber Crime": ("Cyber Complaint Steps", "Cyber Law"),
+    "Theft / Robbery": ("FIR Filing Steps", "Criminal Law"),
+    "Physical Assault": ("FIR Filing Steps", "Criminal Law"),
+    "Sexual Offences": ("FIR Filing Steps", "Criminal Law"),
+    "Homicide / Murder": ("FIR Filing Steps", "Criminal Law"),
+    "Consumer Dispute": ("Consumer Complaint Format", "Civil Law"),
+    "Tenancy / Property Dispute": ("Rental Agreement Checklist", "Civil Law"),
+    "Breach of Contract": ("Legal Notice Format", "Civil Law"),
+}
+DEFAULT_ROUTE = ("Legal Notice Format", "Civil Law")
+
+def load_index(cls, path, rebuild, source=LEGAL_DATA_FILE):
+    """
+    The saved index at path if it was built from the current source;
+    otherwise (missing, older version or stale) it is rebuilt and saved.
+    """
+    index = None
+    if os.path.exists(path):
+        try:
+            index = cls.load(path)
+        except ValueError:
+            pass
+    if index is None or index.source_sha256 != file_digest(source):
+        if os.path.exists(path):
+            print(f"{path} is out of date with {source}; rebuilding it")
+        index = cls(rebuild(source, path))
+    return index
+
+class CaseMatcher:
+    """
+    Routes free-text case descriptions to sections, a problem category, a
+    template and advocates. Everything is loaded once; section searches are
+    memoised on the query's token set (up to cache_size of them), since
+    batches repeat a lot of near-identical descriptions.
+    """
+
+    def __init__(self, index, templates, advocates, k=3, advocates_per_case=3, sections=None,
+                 cache_size=SECTION_CACHE_SIZE):
+        self.index = index
+        self.section_index = sections
+        self.cited_cache = {}
+        self.k = k
+        self.advocates_per_case = advocates_per_case
+        self.classifier = KeywordClassifier(word_boundary=True, priority="score")
+        self.templates = templates
+        self.advocates = advocates
+        self.section_cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+
+    @classmethod
+    def load(cls, k=3, advocates_per_case=3, legal_data=LEGAL_DATA_FILE):
+        index = load_index(LegalSearchIndex, INDEX_FILE, rebuild_index, legal_data)
+        with open(TEMPLATES_FILE, 'r', encoding='utf-8') as f:
+            templates = json.load(f)
+        advocates = load_or_build(RANKING_FILE, ADVOCATES_FILE)
+        sections = load_index(SectionIndex, SECTION_INDEX_FILE, rebuild_section_index, legal_data)
+        return cls(index, templates, advocates, k, advocates_per_case, sections)
+
+    def find_template(self, prefix):
+        for template in self.templates:
+            if template["Template_Name"].startswith(prefix):
+                return template["Template_Name"]
+        return None
+
+    def sections(self, description):
+        key = frozenset(tokenize(description))
+        cached = self.section_cache.get(key)
+        if cached is not None:
+            self.section_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        results = [{
+            "Act_Name": record["Act_Name"],
+            "Section": record["Section"],
+            "Score": round(score, 4),
+            "Penalty": record["Penalty"],
+            "Relief": record["Relief"]
+        } for score, record in self.index.search(description, self.k)]
+        self.section_cache[key] = results
+        if len(self.section_cache) > self.cache_size:
+            self.section_cache.popitem(last=False)
+        return results
+
+    def cited_sections(self, applicable_law):
+        """Sections named in a category's Applicable_Law, resolved once per category."""
+        cited = self.cited_cache.get(applicable_law)
+        if cited is None:
+            cited = self.cited_cache[applicable_law] = [{
+                "Cited_As": record["Cited_As"],
+                "Act_Name": record["Act_Name"],
+                "Section": record["Section"],
+                "Via": record["Via"]
+            } for record in self.section_index.resolve_citation(applicable_law)] if self.section_index else []
+        return cited
+
+    def match(self, title, description):
+        text = f"{title}. {description}"
+        scores = self.classifier.scores(title, description)
+        mapping = self.classifier.best_scored(scores) or DEFAULT_ENTRY
+        problem_type = mapping["Problem_Type"]
+        template_prefix, specialization = CATEGORY_ROUTES.get(problem_type, DEFAULT_ROUTE)
+        return {
+            "Case_Title": title,
+            "Description": description,
+            "Problem_Type": problem_type,
+            "Category_Scores": scores,
+            "Sections": self.sections(text),
+            "Cited_Sections": self.cited_sections(mapping["Applicable_Law"]),
+            "Template": self.find_template(template_prefix),
+            "Advocates": self.advocates.recommend(specialization, k=self.advocates_per_case)
+        }
+
+def iter_cases(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for row in csv.DictReader(f):
+            yield row.get("Case Title", "").strip(), row.get("Description", "").strip()
+
+def make_synthetic_cases(path, n, source=CASES_FILE, seed=0):
+    """Writes n cases built from shuffled sentences of the sample cases and crime headings."""
+    rng = random.Random(seed)
+    sentences = []
+    titles = []
+    for title, description in iter_cases(source):
+        titles.append(title)
+        sentences.extend(s.strip() + "." for s in description.split(".") if s.strip())
+    crime_file = "7k  Unique crime articles.csv"
+    if os.path.exists(crime_file):
+        with open(crime_file, 'r', encoding='utf-8', errors='replace') as f:
+            sentences.extend(row["heading"].strip() + "." for row in csv.DictReader(f) if row.get("heading"))
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Case Title", "Description"])
+        for _ in range(n):
+            writer.writerow([rng.choice(titles), " ".join(rng.sample(sentences, rng.randint(1, 4)))])
+
+def main():
+    parser = argparse.ArgumentParser(description="Match client case descriptions to laws, templates and advocates.")
+    parser.add_argument("--cases", default=CASES_FILE, help="CSV with 'Case Title' and 'Description' columns.")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help=f"Generate this many synthetic cases into {SYNTHETIC_FILE} and match those instead.")
+    parser.add_argument("--legal-data", default=LEGAL_DATA_FILE,
+                        help="Extractor output the section indexes are built from (rebuilt when it changes).")
+    parser.add_argument("-k", type=int, default=3, help="Sections returned per case.")
+    parser.add_argument("--advocates", type=int, default=3, help="Advocates returned per case.")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output as a pretty JSON array (default) or JSON Lines.")
+    args = parser.parse_args()
+
+    cases_file = args.cases
+    if args.synthetic:
+        make_synthetic_cases(SYNTHETIC_FILE, args.synthetic)
+        cases_file = SYNTHETIC_FILE
+        print(f"Wrote {args.synthetic} synthetic cases to {SYNTHETIC_FILE}")
+
+    t0 = time.perf_counter()
+    matcher = CaseMatcher.load(args.k, args.advocates, args.legal_data)
+    t1 = time.perf_counter()
+    print(f"Loaded index, templates and advocates in {t1 - t0:.2f}s")
+
+    output_file = output_path(OUTPUT_FILE, args.format)
+    with RecordWriter(output_file, args.format) as writer:
+        for title, description in iter_cases(cases_file):
+            writer.write(matcher.match(title, description))
+    elapsed = time.perf_counter() - t1
+
+    print(f"Matched {writer.count} cases in {elapsed:.2f}s "
+          f"({writer.count / elapsed if elapsed else 0:,.0f} cases/s, {matcher.cache_hits} section cache hits)")
+    print(f"Saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
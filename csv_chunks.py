@@ -0,0 +1,115 @@
+
+import io
+import os
+import re
+import csv
+import mmap
+
+# Splitting CSV files into byte ranges that start and end on record
+# boundaries, so that each range can be parsed independently by a worker.
+
+BLOCK_SIZE = 1 << 20
+
+# A quoted field as the csv module reads it: starts a field, contains only
+# doubled quotes, and is followed by a delimiter or line end.
+QUOTED_FIELD = re.compile(rb'(?:^|(?<=[,\n]))"[^"]*(?:""[^"]*)*"(?=[,\r\n]|$)')
+
+def count_quotes(mm):
+    total = 0
+    for pos in range(0, len(mm), BLOCK_SIZE):
+        total += mm[pos:pos + BLOCK_SIZE].count(b'"')
+    return total
+
+def quotes_are_well_formed(path):
+    """
+    True if every quote in the file belongs to a well-formed quoted field.
+    Then a newline is inside a field exactly when an odd number of quotes
+    precede it, and quote_parity_boundaries() agrees with the csv module.
+    """
+    with open(path, 'rb') as f:
+        if not f.read(1):
+            return True
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            quoted = sum(m.group().count(b'"') for m in QUOTED_FIELD.finditer(mm))
+            return quoted == count_quotes(mm)
+
+def quote_parity_boundaries(path, chunk_bytes):
+    """
+    Byte offsets of record starts, the first one right after the header and
+    then one at least every chunk_bytes. Tracks quote parity with
+    bytes.count, so it runs at close to disk speed.
+    """
+    boundaries = []
+    target = 0
+    in_quotes = False
+    pos = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            i = 0
+            n = len(block)
+            while i < n:
+                # A newline at target - 1 already gives a boundary at target
+                if pos + i < target - 1:
+                    j = min(n, target - 1 - pos)
+                    in_quotes ^= bool(block.count(b'"', i, j) & 1)
+                    i = j
+                    continue
+                nl = block.find(b'\n', i)
+                if nl < 0:
+                    in_quotes ^= bool(block.count(b'"', i) & 1)
+                    break
+                in_quotes ^= bool(block.count(b'"', i, nl) & 1)
+                i = nl + 1
+                if not in_quotes:
+                    boundaries.append(pos + i)
+                    target = pos + i + chunk_bytes
+            pos += n
+    return boundaries
+
+def csv_module_boundaries(path, chunk_bytes):
+    """Same as quote_parity_boundaries(), but lets the csv module find record ends."""
+    boundaries = []
+    target = 0
+    consumed = 0
+    with open(path, 'rb') as f:
+        def lines():
+            nonlocal consumed
+            for raw in f:
+                consumed += len(raw)
+                yield raw.decode('utf-8', errors='replace')
+
+        for _ in csv.reader(lines()):
+            if consumed >= target and (not boundaries or consumed > boundaries[-1]):
+                boundaries.append(consumed)
+                target = consumed + chunk_bytes
+    return boundaries
+
+def split_csv(path, chunk_bytes):
+    """
+    Returns (fieldnames, [(start, end), ...]) where the byte ranges cover
+    every record after the header and each starts on a record boundary.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        fieldnames = next(csv.reader(f), None)
+    if fieldnames is None:
+        return None, []
+
+    if quotes_are_well_formed(path):
+        boundaries = quote_parity_boundaries(path, chunk_bytes)
+    else:
+        boundaries = csv_module_boundaries(path, chunk_bytes)
+
+    if not boundaries:
+        return fieldnames, []
+    edges = boundaries + [os.path.getsize(path)]
+    ranges = [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+    return fieldnames, ranges
+
+def read_chunk_rows(path, start, end, fieldnames):
+    """DictReader over the records in bytes [start, end) of a CSV file."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Universal newlines, like opening the file in text mode
+    text = io.StringIO(data.decode('utf-8', errors='replace'), newline=None)
+    return csv.DictReader(text, fieldnames=fieldnames)
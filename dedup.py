@@ -0,0 +1,187 @@
+
+import mmap
+import hashlib
+import tempfile
+from bisect import bisect_left
+
+# Compact set of 64-bit string digests for deduplicating large inputs.
+# A Python set of heading strings costs ~100+ bytes per entry; this table
+# costs 8 bytes per slot (16 per entry at the maximum load of 1/2).
+# Two different strings collide with probability ~n^2 / 2^65, i.e. about
+# one in 10^7 for a billion distinct headings.
+
+INITIAL_SLOTS = 1 << 16
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+def digest64(text):
+    """Non-zero 64-bit BLAKE2b digest of a string (0 marks an empty slot)."""
+    d = hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(d, 'little') or 1
+
+class DigestSet:
+    """
+    Open-addressing hash table of 64-bit digests. Once the table would need
+    more than memory_limit bytes and a spill_dir is given, it moves into a
+    memory-mapped temporary file there, so the OS can page it out.
+    """
+
+    def __init__(self, spill_dir=None, memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.spill_dir = spill_dir
+        self.memory_limit = memory_limit
+        self.count = 0
+        self.spilled = False
+        self._mmap = None
+        self._file = None
+        self._new_table(INITIAL_SLOTS)
+
+    def _new_table(self, slots):
+        nbytes = slots * 8
+        old = (getattr(self, 'table', None), self._mmap, self._file)
+        if self.spill_dir and nbytes > self.memory_limit:
+            self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+            self._file.truncate(nbytes)
+            self._mmap = mmap.mmap(self._file.fileno(), nbytes)
+            self.table = memoryview(self._mmap).cast('Q')
+            self.spilled = True
+        else:
+            self._file = self._mmap = None
+            self.table = memoryview(bytearray(nbytes)).cast('Q')
+        self.mask = slots - 1
+        return old
+
+    @property
+    def nbytes(self):
+        return (self.mask + 1) * 8
+
+    def _insert(self, d):
+        table = self.table
+        mask = self.mask
+        i = d & mask
+        while True:
+            v = table[i]
+            if v == 0:
+                table[i] = d
+                return True
+            if v == d:
+                return False
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old_table, old_mmap, old_file = self._new_table((self.mask + 1) * 2)
+        for v in old_table:
+            if v:
+                self._insert(v)
+        old_table.release()
+        if old_mmap is not None:
+            old_mmap.close()
+            old_file.close()
+
+    def add(self, text):
+        """Adds a string; returns True if it was not in the set yet."""
+        if not self._insert(digest64(text)):
+            return False
+        self.count += 1
+        if self.count * 2 > self.mask + 1:
+            self._grow()
+        return True
+
+    def __contains__(self, text):
+        d = digest64(text)
+        table = self.table
+        mask = self.mask
+        i = d & mask
+        while True:
+            v = table[i]
+            if v == 0:
+                return False
+            if v == d:
+                return True
+            i = (i + 1) & mask
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.table.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+# --- Near-duplicates ---
+# MinHash signatures with one-permutation hashing: a set's 64-bit digests
+# are sorted once and split by their top bits into SIGNATURE_SIZE bins, and
+# each signature slot is the smallest digest in its bin (so one sort and a
+# bisect per bin instead of a pass over the set per hash function). Empty
+# bins borrow the next non-empty bin's value, offset by the distance, so
+# small sets still get full signatures. Two sets agree on a slot with
+# probability about equal to their Jaccard similarity.
+
+SIGNATURE_SIZE = 64
+BIN_SHIFT = 64 - (SIGNATURE_SIZE.bit_length() - 1)
+LSH_BANDS = 16              # 16 bands of 4 slots: pairs above ~0.5 similarity nearly always share a bucket
+
+def minhash(digests):
+    """SIGNATURE_SIZE-slot MinHash signature (a tuple) of a non-empty set of 64-bit digests."""
+    ordered = sorted(digests)
+    bins = [None] * SIGNATURE_SIZE
+    for slot in range(SIGNATURE_SIZE):
+        i = bisect_left(ordered, slot << BIN_SHIFT)
+        if i < len(ordered) and ordered[i] >> BIN_SHIFT == slot:
+            bins[slot] = ordered[i]
+    signature = list(bins)
+    for slot in range(SIGNATURE_SIZE):
+        if bins[slot] is None:
+            distance = 1
+            while bins[(slot + distance) % SIGNATURE_SIZE] is None:
+                distance += 1
+            signature[slot] = bins[(slot + distance) % SIGNATURE_SIZE] + distance
+    return tuple(signature)
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class LSHIndex:
+    """
+    Buckets signatures by band, so that only items sharing a whole band are
+    ever compared: candidate pairs cost roughly O(n) instead of O(n^2).
+    """
+
+    def __init__(self, bands=LSH_BANDS):
+        self.rows = SIGNATURE_SIZE // bands
+        self.bands = bands
+        self.buckets = {}
+
+    def add(self, key, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            self.buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(key)
+
+    def candidate_pairs(self):
+        """Each pair of keys that share at least one bucket, once, as (earlier, later) in insertion order."""
+        seen = set()
+        for keys in self.buckets.values():
+            for i, a in enumerate(keys):
+                for b in keys[i + 1:]:
+                    if (a, b) not in seen:
+                        seen.add((a, b))
+                        yield a, b
+
+def clusters(pairs, n):
+    """Connected components (lists of indices, ascending) with more than one member, over indices 0..n-1."""
+    parent = list(range(n))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups = {}
+    for i in range(n):
+        groups.setdefault(root(i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
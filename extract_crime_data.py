@@ -3,6 +3,13 @@ import csv
 import json
 import os
 import re
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from json_output import FORMATS, RecordWriter, output_path
+from csv_chunks import split_csv, read_chunk_rows
+from dedup import DigestSet
 
 # Configuration
 INPUT_FILES = [
@@ -105,81 +112,325 @@ DEFAULT_ENTRY = {
     "Escalation": "Court of Law"
 }
 
-def map_article_to_legal_issue(heading, summary):
-    text = (str(heading) + " " + str(summary)).lower()
-    
-    for mapping in KEYWORD_MAP:
-        for keyword in mapping["keywords"]:
-            if keyword in text:
-                return {
-                    "Problem_Type": mapping["Problem_Type"],
-                    "Applicable_Law": mapping["Applicable_Law"],
-                    "Relief_Type": mapping["Relief_Type"],
-                    "Average_Timeline": mapping["Average_Timeline"],
-                    "Escalation": mapping["Escalation"],
-                    "Source_Heading": heading # Keep reference
-                }
+def build_trie_pattern(keywords):
+    """
+    Compiles keywords into a trie-shaped regex, e.g. ["bank", "beat"] ->
+    "b(?:ank|eat)", so the C regex engine walks the keyword trie once per
+    text position instead of trying every keyword in turn.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+class KeywordClassifier:
+    """
+    Multi-keyword matcher over KEYWORD_MAP, built once. hits() and scores()
+    find every keyword occurrence in a single pass over the lowercased text
+    using a trie-shaped regex.
+
+    word_boundary=False matches keywords anywhere (the original behaviour,
+    where "data" hits "update"); word_boundary=True requires a keyword to
+    start a word, so "kill" no longer hits "skill" but still hits "killed".
+
+    priority="first" returns the first KEYWORD_MAP rule with any hit (the
+    original behaviour); priority="score" returns the rule with the most
+    keyword hits, ties going to the earlier rule.
+    """
+
+    def __init__(self, keyword_map=KEYWORD_MAP, word_boundary=False, priority="first"):
+        if priority not in ("first", "score"):
+            raise ValueError(f"Unknown priority: {priority}")
+        self.keyword_map = keyword_map
+        self.priority = priority
+        self.word_boundary = word_boundary
+        # Keywords in KEYWORD_MAP order, for the first-rule substring check
+        self.ordered = [(keyword.lower(), idx) for idx, mapping in enumerate(keyword_map)
+                        for keyword in mapping["keywords"]]
+        owners = {}
+        for idx, mapping in enumerate(keyword_map):
+            for keyword in mapping["keywords"]:
+                owners.setdefault(keyword.lower(), set()).add(idx)
+        # The trie reports the longest keyword at a position, so a hit also
+        # counts for every shorter keyword that is a prefix of it
+        self.rules_of = {}
+        for keyword in owners:
+            rules = set()
+            for other, idxs in owners.items():
+                if keyword.startswith(other):
+                    rules |= idxs
+            self.rules_of[keyword] = sorted(rules)
+        trie = build_trie_pattern(owners)
+        if word_boundary:
+            self.pattern = re.compile(r'\b(' + trie + ')')
+        else:
+            # Zero-width lookahead so overlapping keywords are all reported
+            self.pattern = re.compile('(?=(' + trie + '))')
+
+    def hits(self, text):
+        """Rule index of every keyword occurrence in (already lowercased) text."""
+        rules_of = self.rules_of
+        return [idx for m in self.pattern.finditer(text) for idx in rules_of[m.group(1)]]
+
+    def scores(self, heading, summary):
+        """Keyword hit count per matching Problem_Type."""
+        text = (str(heading) + " " + str(summary)).lower()
+        counts = {}
+        for idx in self.hits(text):
+            problem_type = self.keyword_map[idx]["Problem_Type"]
+            counts[problem_type] = counts.get(problem_type, 0) + 1
+        return counts
+
+    def best_scored(self, scores):
+        """
+        The priority="score" winner for counts from scores(), without scanning
+        the text again (rules sharing a Problem_Type count together).
+        """
+        best, best_count = None, 0
+        for mapping in self.keyword_map:
+            count = scores.get(mapping["Problem_Type"], 0)
+            if count > best_count:
+                best, best_count = mapping, count
+        return best
+
+    def best_rule(self, heading, summary):
+        """The winning KEYWORD_MAP entry, or None if no keyword matches."""
+        text = (str(heading) + " " + str(summary)).lower()
+        if self.priority == "first" and not self.word_boundary:
+            # CPython's substring search beats any regex scan here, and most
+            # rows stop at one of the first rules, so check keywords in order
+            best = None
+            for keyword, idx in self.ordered:
+                if keyword in text:
+                    best = idx
+                    break
+        elif self.priority == "first":
+            best = None
+            for m in self.pattern.finditer(text):
+                idx = self.rules_of[m.group(1)][0]
+                if best is None or idx < best:
+                    best = idx
+                    if best == 0:
+                        break
+        else:
+            counts = {}
+            for idx in self.hits(text):
+                counts[idx] = counts.get(idx, 0) + 1
+            best = min(counts, key=lambda idx: (-counts[idx], idx)) if counts else None
+        return None if best is None else self.keyword_map[best]
+
+DEFAULT_CLASSIFIER = KeywordClassifier()
+
+def map_article_to_legal_issue(heading, summary, classifier=None):
+    mapping = (classifier or DEFAULT_CLASSIFIER).best_rule(heading, summary)
+    if mapping:
+        return {
+            "Problem_Type": mapping["Problem_Type"],
+            "Applicable_Law": mapping["Applicable_Law"],
+            "Relief_Type": mapping["Relief_Type"],
+            "Average_Timeline": mapping["Average_Timeline"],
+            "Escalation": mapping["Escalation"],
+            "Source_Heading": heading # Keep reference
+        }
     
     # If no specific keyword matches, return None (or default if you want to keep everything)
     # Returning None to filter for "high quality" mapped data as per "extract max" philosophy but meaningful max.
     return None
 
-def main():
-    extracted_data = []
-    
-    for file_name in INPUT_FILES:
-        if not os.path.exists(file_name):
-            print(f"File not found: {file_name}")
+def iter_mapped_items(rows, classifier):
+    """Yields map_article_to_legal_issue() results for the mappable CSV rows."""
+    for row in rows:
+        # Adjust column names based on actual header inspection
+        # Header: heading,content_summary,article_link,img_link,month,date,time,Year
+        
+        heading = row.get('heading', '').strip()
+        summary = row.get('content_summary', '').strip()
+        
+        if not heading and not summary:
             continue
             
-        print(f"Processing {file_name}...")
-        try:
-            with open(file_name, 'r', encoding='utf-8', errors='replace') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    # Adjust column names based on actual header inspection
-                    # Header: heading,content_summary,article_link,img_link,month,date,time,Year
-                    
-                    heading = row.get('heading', '').strip()
-                    summary = row.get('content_summary', '').strip()
-                    
-                    if not heading and not summary:
-                        continue
-                        
-                    mapped_entry = map_article_to_legal_issue(heading, summary)
-                    if mapped_entry:
-                        extracted_data.append(mapped_entry)
-                        
-        except Exception as e:
-            print(f"Error reading {file_name}: {e}")
-
-    # Remove duplicates based on heading
-    seen_headings = set()
-    unique_data = []
-    for item in extracted_data:
-        if item['Source_Heading'] not in seen_headings:
-            seen_headings.add(item['Source_Heading'])
-            # Remove the source heading from final output to match exact requested format?
-            # User format included: "Problem_Type", "Applicable_Law", "Relief_Type", "Average_Timeline", "Escalation"
-            # I will keep Source_Heading out of the final dict to match strict schema, but maybe it's useful context?
-            # User request: "from the 7k ... extract and make this into this formate"
-            # The example did NOT have source text. So I will clean it.
-            
-            clean_item = {
+        item = map_article_to_legal_issue(heading, summary, classifier)
+        if item:
+            yield item
+
+def iter_file_items(file_name, classifier):
+    with open(file_name, 'r', encoding='utf-8', errors='replace') as csvfile:
+        yield from iter_mapped_items(csv.DictReader(csvfile), classifier)
+
+_chunk_classifiers = {}
+
+def classify_chunk(file_name, start, end, fieldnames, word_boundary, priority):
+    """
+    Pool worker: maps the records in bytes [start, end) of a CSV file.
+    Headings repeated inside the chunk are dropped here already; only the
+    first occurrence can survive the global dedup anyway.
+    """
+    key = (word_boundary, priority)
+    if key not in _chunk_classifiers:
+        _chunk_classifiers[key] = KeywordClassifier(word_boundary=word_boundary, priority=priority)
+    classifier = _chunk_classifiers[key]
+
+    seen = set()
+    items = []
+    for item in iter_mapped_items(read_chunk_rows(file_name, start, end, fieldnames), classifier):
+        if item['Source_Heading'] not in seen:
+            seen.add(item['Source_Heading'])
+            items.append(item)
+    return items
+
+def iter_chunked_items(pool, workers, file_name, classifier, chunk_bytes):
+    """
+    Splits a CSV into record-aligned byte ranges, classifies them in the pool
+    and yields the mapped items in file order. At most 2 * workers chunks
+    are in flight, so memory depends on the worker count, not the file size.
+    """
+    fieldnames, ranges = split_csv(file_name, chunk_bytes)
+    print(f"  {len(ranges)} chunk(s) of ~{chunk_bytes / (1024 * 1024):g} MB")
+    pending = deque()
+    ranges = iter(ranges)
+    while True:
+        while len(pending) < 2 * workers:
+            chunk = next(ranges, None)
+            if chunk is None:
+                break
+            pending.append(pool.submit(classify_chunk, file_name, chunk[0], chunk[1], fieldnames,
+                                       classifier.word_boundary, classifier.priority))
+        if not pending:
+            break
+        yield from pending.popleft().result()
+
+class ProblemAggregator:
+    """
+    Collapses mapped items into one record per Problem_Type with the number
+    of unique articles and up to max_sources of their headings.
+    """
+
+    def __init__(self, max_sources=25):
+        self.max_sources = max_sources
+        self.groups = {}
+        self.total = 0
+
+    def add(self, item):
+        self.total += 1
+        group = self.groups.get(item["Problem_Type"])
+        if group is None:
+            group = self.groups[item["Problem_Type"]] = {
                 "Problem_Type": item["Problem_Type"],
                 "Applicable_Law": item["Applicable_Law"],
                 "Relief_Type": item["Relief_Type"],
                 "Average_Timeline": item["Average_Timeline"],
-                "Escalation": item["Escalation"]
+                "Escalation": item["Escalation"],
+                "Count": 0,
+                "Source_Headings": []
             }
-            unique_data.append(clean_item)
+        group["Count"] += 1
+        if self.max_sources < 0 or len(group["Source_Headings"]) < self.max_sources:
+            group["Source_Headings"].append(item["Source_Heading"])
 
-    print(f"Extracted {len(unique_data)} mapped issues.")
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(unique_data, f, indent=4, ensure_ascii=False)
-    
-    print(f"Saved to {OUTPUT_FILE}")
+    def records(self):
+        """Aggregated records, most frequent problem type first."""
+        return sorted(self.groups.values(), key=lambda group: -group["Count"])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Map crime news articles to legal problem types.")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output as a pretty JSON array (default) or JSON Lines.")
+    parser.add_argument("--word-boundary", action="store_true",
+                        help="Only match keywords at the start of a word (\"kill\" no longer matches \"skill\").")
+    parser.add_argument("--priority", choices=("first", "score"), default="first",
+                        help="Pick the first matching KEYWORD_MAP rule (default) or the one with most keyword hits.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Classify CSV chunks in this many processes (1 = read row by row, 0 = one per CPU).")
+    parser.add_argument("--chunk-mb", type=float, default=8,
+                        help="Approximate size of each CSV chunk handed to a worker.")
+    parser.add_argument("--aggregate", action="store_true",
+                        help="Write each Problem_Type once with a count and source headings instead of one entry per article.")
+    parser.add_argument("--max-sources", type=int, default=25,
+                        help="Source headings kept per Problem_Type with --aggregate (-1 = all).")
+    parser.add_argument("--dedup-spill-dir", default=None,
+                        help="Move the heading digest table to a memory-mapped file here once it outgrows --dedup-memory-mb.")
+    parser.add_argument("--dedup-memory-mb", type=float, default=64,
+                        help="In-memory size limit of the heading digest table before spilling.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    classifier = KeywordClassifier(word_boundary=args.word_boundary, priority=args.priority)
+    output_file = output_path(OUTPUT_FILE, args.format)
+
+    # Remove duplicates based on heading while reading, so each unique entry
+    # is written out as soon as it is mapped. Headings are kept as 64-bit
+    # digests, not strings.
+    seen_headings = DigestSet(spill_dir=args.dedup_spill_dir,
+                              memory_limit=int(args.dedup_memory_mb * 1024 * 1024))
+    aggregator = ProblemAggregator(args.max_sources) if args.aggregate else None
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    chunk_bytes = int(args.chunk_mb * 1024 * 1024)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        with RecordWriter(output_file, args.format) as writer:
+            for file_name in INPUT_FILES:
+                if not os.path.exists(file_name):
+                    print(f"File not found: {file_name}")
+                    continue
+                    
+                print(f"Processing {file_name}...")
+                t0 = time.perf_counter()
+                try:
+                    if pool:
+                        items = iter_chunked_items(pool, workers, file_name, classifier, chunk_bytes)
+                    else:
+                        items = iter_file_items(file_name, classifier)
+                    for item in items:
+                        if not seen_headings.add(item['Source_Heading']):
+                            continue
+                        if aggregator:
+                            aggregator.add(item)
+                            continue
+
+                        # The requested format has no source text, so the
+                        # heading is only used for dedup and kept out of the output
+                        clean_item = {
+                            "Problem_Type": item["Problem_Type"],
+                            "Applicable_Law": item["Applicable_Law"],
+                            "Relief_Type": item["Relief_Type"],
+                            "Average_Timeline": item["Average_Timeline"],
+                            "Escalation": item["Escalation"]
+                        }
+                        writer.write(clean_item)
+                                
+                except Exception as e:
+                    print(f"Error reading {file_name}: {e}")
+                print(f"  {file_name}: {time.perf_counter() - t0:.2f}s")
+            if aggregator:
+                writer.write_all(aggregator.records())
+    finally:
+        if pool:
+            pool.shutdown()
+        seen_headings.close()
+
+    print(f"Unique headings: {len(seen_headings)} ({seen_headings.nbytes / 1024:.0f} KiB digest table"
+          f"{', spilled to disk' if seen_headings.spilled else ''})")
+    if aggregator:
+        print(f"Aggregated {aggregator.total} mapped issues into {writer.count} problem types.")
+    else:
+        print(f"Extracted {writer.count} mapped issues.")
+    print(f"Saved to {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,25 +1,44 @@
 
 import os
+import sys
 import json
 import re
-from pypdf import PdfReader
+import time
+import argparse
+import hashlib
+import inspect
+import pstats
+import cProfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pdf_cache
+import section_index
+from pdf_cache import PageTextCache
+from act_registry import REGISTRY_FILE, ActRegistry, ChecksumMismatch
+from json_output import FORMATS, RecordWriter, output_path, read_records
+from legal_search import INDEX_FILE, rebuild_index
+from section_dedup import REPORT_FILE as DEDUP_REPORT_FILE, dedup_file
+from section_index import (SECTION_INDEX_FILE, EntryClassifier, rebuild_section_index,
+                           ARRANGEMENT, NOTE_START, BODY_MARKER)
+from stage_profiler import REPORT_FILE, StageProfiler, TimedPattern, format_report
 
 # Configuration
-PDF_DIR = "/Users/nikhilkmenon/Desktop/Law_Lite"
+# The acts, their PDF files and the directory holding them come from the
+# act registry (acts.json, see act_registry.py)
 OUTPUT_FILE = "legal_data.json"
 
-# File mapping to Act Names
-FILE_ACT_MAP = {
-    "ipc_act.pdf": "Indian Penal Code (IPC)",
-    "Bharatiya Nyaya Sanhita (new criminal laws).pdf": "Bharatiya Nyaya Sanhita (BNS)",
-    "CP Act 2019_1732700731.pdf": "Consumer Protection Act 2019",
-    "it_act_2000_updated.pdf": "Information Technology Act 2000",
-    "IC ACT.pdf": "Indian Contract Act 1872",
-    "the_companies_act,_2013_no._18_of_2013_date_29.08.2013.pdf": "Companies Act 2013",
-    "THE TRANSFER OF PROPERTY ACT, 1882.pdf": "Transfer of Property Act 1882",
-    # "property act.pdf" seems duplicate or similar, skipping for now or can process if distinct
-    "Labour Laws.pdf": "Labour Laws" # Placeholder if file exists
-}
+# Parallel extraction: large PDFs are split into page ranges of this size
+# so that a single big act (BNSS, Companies Act) can use several workers.
+PAGES_PER_TASK = 25
+
+# Incremental mode: one JSON shard per act plus a manifest recording the
+# source file hash and extractor version each shard was built from.
+SHARD_DIR = "legal_data_shards"
+SHARD_MANIFEST = os.path.join(SHARD_DIR, "manifest.json")
+
+# Profiling: --cprofile output and how many functions / allocation sites to print
+CPROFILE_FILE = "extraction.prof"
+PROFILE_TOP = 20
 
 def clean_text(text):
     """Cleans extracted text by removing excessive whitespace and artifacts."""
@@ -31,24 +50,164 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
-def extract_section_data(text, act_name):
+# Clause keywords. Each rule captures from the keyword up to the end of the
+# sentence or ;  and the longest captured clause wins (ties: earlier rule).
+PENALTY_KEYWORDS = [
+    'shall be punished with',
+    'punishable with',
+    'imprisonment for',
+    'fine which may extend'
+]
+
+RELIEF_KEYWORDS = [
+    'fail to pay', # Often context for relief/consequence
+    'compensation',
+    'refund',
+    'damages',
+    'restore',
+    'reimburse'
+]
+
+# Characters on which re.IGNORECASE and str.lower() disagree for ASCII
+# keywords (dotted/dotless i, long s). Text containing them takes the slow path.
+CASE_FOLD_SPECIAL = re.compile('[\u0130\u0131\u017f]')
+
+class ClauseMatcher:
+    """
+    Finds the longest "<keyword>...(.|;|end)" clause for every field in one
+    scan of the text. For each field this is equivalent to running
+    re.search(r'(<keyword>.*?)(?:\.|;|$)', text, re.IGNORECASE) once per
+    keyword and keeping the longest stripped group(1).
+    """
+
+    def __init__(self, rules):
+        # rules: {field: [keywords]}, matched case-insensitively as literals
+        self.fields = list(rules)
+        self.rules = [(field, kw.lower()) for field, keywords in rules.items() for kw in keywords]
+        self.index = {}
+        for idx, (_, kw) in enumerate(self.rules):
+            self.index.setdefault(kw, []).append(idx)
+        # Keywords that can start at the same position as a given keyword
+        self.same_start = {
+            kw: [idx for idx, (_, other) in enumerate(self.rules) if other.startswith(kw) or kw.startswith(other)]
+            for kw in self.index
+        }
+        self.scanner = re.compile('|'.join(re.escape(kw) for _, kw in self.rules))
+        self.slow_patterns = [re.compile(re.escape(kw), re.IGNORECASE) for _, kw in self.rules]
+        self.terminator = re.compile(r'[.;\n]')
+
+    def _clause_end(self, text, pos):
+        """End of the clause whose keyword ends at pos, or None if `.` can't reach a terminator."""
+        m = self.terminator.search(text, pos)
+        if not m:
+            return len(text)
+        if m.group() != '\n' or m.start() == len(text) - 1:
+            return m.start()
+        return None
+
+    def _scan(self, text):
+        found = [None] * len(self.rules)
+        lowered = text.lower()
+        remaining = len(self.rules)
+        m = self.scanner.search(lowered)
+        while m:
+            pos = m.start()
+            for idx in self.same_start[m.group()]:
+                kw = self.rules[idx][1]
+                if found[idx] is not None or not lowered.startswith(kw, pos):
+                    continue
+                end = self._clause_end(text, pos + len(kw))
+                if end is not None:
+                    found[idx] = text[pos:end].strip()
+                    remaining -= 1
+            if not remaining:
+                break
+            m = self.scanner.search(lowered, pos + 1)
+        return found
+
+    def _scan_slow(self, text):
+        found = [None] * len(self.rules)
+        for idx, pat in enumerate(self.slow_patterns):
+            m = pat.search(text)
+            while m:
+                end = self._clause_end(text, m.end())
+                if end is not None:
+                    found[idx] = text[m.start():end].strip()
+                    break
+                m = pat.search(text, m.start() + 1)
+        return found
+
+    def match(self, text):
+        """Returns {field: longest clause or ""}."""
+        if CASE_FOLD_SPECIAL.search(text):
+            found = self._scan_slow(text)
+        else:
+            found = self._scan(text)
+
+        best = {field: "" for field in self.fields}
+        for (field, _), clause in zip(self.rules, found):
+            if clause is not None and len(clause) > len(best[field]): # Keep the longest match which likely has more detail
+                best[field] = clause
+        return best
+
+CLAUSE_MATCHER = ClauseMatcher({"Penalty": PENALTY_KEYWORDS, "Relief": RELIEF_KEYWORDS})
+
+# Generic regex for Section start.
+# BNS: "1. (1)", IPC: "Section 302.", Contract: "10."
+# Matches "\n123. " or "Section 123. "
+# We use a lookahead to split by the *next* section start
+SECTION_START = re.compile(r'(?:^|\s)(?:Section\s+)?(\d+[A-Za-z]*)\.?\s+(?=[A-Z])')
+
+# Section-start pattern for each registry profile this extractor handles.
+# Acts with other profiles (e.g. the BNSS forms) are read by other scripts.
+DEFAULT_PROFILE = "india_code"
+SECTION_PATTERNS = {DEFAULT_PROFILE: SECTION_START}
+
+def build_section_entry(sec_num, content, act_name):
+    """Builds the output record for one (number, content) part, or None if it is too short."""
+    sec_num = sec_num.strip()
+    content = content.strip()
+
+    # Check if content is actually a section or just a reference number
+    # A valid section usually has some length
+    if len(content) < 5:
+        return None
+
+    # --- Extraction Logic ---
+
+    # 1. Applicable Scenario (The main description)
+    # Usually the whole text until the Penalty clause
+    applicable_scenario = content
+
+    # 2. Penalty and 3. Relief
+    # Penalty keywords (punished with, imprisonment for, ...) and relief
+    # keywords (compensation, refund, ...) are found in a single scan;
+    # each captures until end of sentence or ;
+    clauses = CLAUSE_MATCHER.match(content)
+    penalty = clauses["Penalty"]
+    relief = clauses["Relief"]
+
+    # Clean scenario to remove the penalty text if it looks redundant?
+    # Sometimes better to leave it for context. User asked for "extract max".
+
+    return {
+        "Act_Name": act_name,
+        "Section": sec_num,
+        "Applicable_Scenario": applicable_scenario,
+        "Penalty": penalty,
+        "Relief": relief
+    }
+
+def extract_section_data(text, act_name, profile=DEFAULT_PROFILE):
     """
     Parses text to identify sections and extract relevant fields.
     Refined for better capture.
     """
     sections_data = []
     
-    # Generic regex for Section start. 
-    # BNS: "1. (1)", IPC: "Section 302.", Contract: "10."
-    # Matches "\n123. " or "Section 123. "
-    # We use a lookahead to split by the *next* section start
-    
-    # Common pattern for start of a section
-    section_start_pattern = r'(?:^|\s)(?:Section\s+)?(\d+[A-Za-z]*)\.?\s+(?=[A-Z])'
-    
     # Split text by section numbers
     # capturing the delimiter (section number) to keep it
-    parts = re.split(section_start_pattern, text)
+    parts = SECTION_PATTERNS[profile].split(text)
     
     # parts[0] is intro text key, parts[1] is number, parts[2] is content, parts[3] is number...
     
@@ -56,122 +215,518 @@ def extract_section_data(text, act_name):
         # Fallback for simple numbering "1. " at start of line
         parts = re.split(r'(?:^|\s)(\d+)\.\s+(?=[A-Z])', text)
 
-    # If still low, just return empty or try one big block?
-    # Let's iterate what we found.
-    
     # Processing in pairs of (Number, Content)
     # parts[0] is preamble/before first match
     
-    current_sec_num = "Intro"
-    
     # We iterate starting from index 1 which should be a number
+    classifier = EntryClassifier()
     for i in range(1, len(parts), 2):
         if i+1 >= len(parts): break
         
-        sec_num = parts[i].strip()
-        content = parts[i+1].strip()
-        
-        # Check if content is actually a section or just a reference number
-        # A valid section usually has some length
-        if len(content) < 5: 
+        entry = build_section_entry(parts[i], parts[i+1], act_name)
+        if entry:
+            entry["Entry_Type"] = classifier.classify(entry["Section"], entry["Applicable_Scenario"])
+            sections_data.append(entry)
+
+    return sections_data
+
+# --- Streaming pipeline ---
+# Produces the same entries as clean_text + extract_section_data over the
+# joined pages, but holds roughly one page plus one section in memory
+# instead of several copies of the whole act.
+
+WHITESPACE = re.compile(r'\s+')
+
+def iter_clean_pages(page_texts):
+    """
+    Yields chunks whose concatenation equals clean_text() of the joined pages:
+    whitespace runs collapse to one space, also across page breaks.
+    """
+    started = False
+    pending_space = False
+    for text in page_texts:
+        if not text:
+            continue
+        chunk = WHITESPACE.sub(' ', text + "\n")
+        lead = chunk.startswith(' ')
+        body = chunk.strip(' ')
+        if not body:
+            pending_space = pending_space or lead
             continue
+        if started and (pending_space or lead):
+            body = ' ' + body
+        yield body
+        started = True
+        pending_space = chunk.endswith(' ')
 
-        # --- Extraction Logic ---
-        
-        # 1. Applicable Scenario (The main description)
-        # Usually the whole text until the Penalty clause
-        applicable_scenario = content
-        
-        # 2. Penalty
-        # Search for penalty keywords
-        penalty = ""
-        # Improved regex for penalty: captures until end of sentence or ;
-        penalty_patterns = [
-            r'(shall be punished with.*?)(\.|;|$)',
-            r'(punishable with.*?)(\.|;|$)',
-            r'(imprisonment for.*?)(\.|;|$)',
-            r'(fine which may extend.*?)(\.|;|$)'
-        ]
-        
-        for pat in penalty_patterns:
-            match = re.search(pat, content, re.IGNORECASE)
-            if match:
-                penalty_text = match.group(1).strip()
-                if len(penalty_text) > len(penalty): # Keep the longest match which likely has more detail
-                    penalty = penalty_text
-
-        # 3. Relief
-        # Search for relief keywords (compensation, etc)
-        relief = ""
-        relief_patterns = [
-            r'(fail to pay.*?)(?:\.|;|$)', # Often context for relief/consequence
-            r'(compensation.*?)(?:\.|;|$)',
-            r'(refund.*?)(?:\.|;|$)',
-            r'(damages.*?)(?:\.|;|$)',
-            r'(restore.*?)(?:\.|;|$)',
-            r'(reimburse.*?)(?:\.|;|$)'
-        ]
-        
-        for pat in relief_patterns:
-            match = re.search(pat, content, re.IGNORECASE)
-            if match:
-                relief_text = match.group(1).strip()
-                if len(relief_text) > len(relief):
-                    relief = relief_text
-        
-        # Clean scenario to remove the penalty text if it looks redundant? 
-        # Sometimes better to leave it for context. User asked for "extract max".
-        
-        entry = {
-            "Act_Name": act_name,
-            "Section": sec_num,
-            "Applicable_Scenario": applicable_scenario,
-            "Penalty": penalty,
-            "Relief": relief
-        }
-        
-        sections_data.append(entry)
+def iter_section_parts(chunks, section_start=SECTION_START):
+    """
+    Streaming equivalent of section_start.split() over the joined chunks.
+    Yields (section number, content) pairs; the preamble is dropped.
+    (The fallback split in extract_section_data can only match where
+    SECTION_START does, so it never applies and is not repeated here.)
+    """
+    buf = ""
+    sec_num = None      # number of the section whose content is being read
+    content_start = 0   # buf index where that content starts
+    scan_pos = 0        # buf index where the next SECTION_START search starts
+    for chunk in chunks:
+        buf += chunk
+        while True:
+            # Every greedy run in SECTION_START is followed by a character
+            # the lookahead has already seen, so a match found in the buffer
+            # is the same match the whole-text split would find.
+            m = section_start.search(buf, scan_pos)
+            if not m:
+                break
+            if sec_num is not None:
+                yield sec_num, buf[content_start:m.start()]
+            sec_num = m.group(1)
+            # Keep one character before the content so that ^ can't match
+            # at the start of the trimmed buffer
+            buf = buf[m.end() - 1:]
+            content_start = scan_pos = 1
+        # A pending match spans at most three spaces (before the number,
+        # after "Section", before the next word), so it starts at or after
+        # the third-last space in the buffer.
+        pos = len(buf)
+        for _ in range(3):
+            pos = buf.rfind(' ', scan_pos, pos)
+            if pos < 0:
+                break
+        if pos > scan_pos:
+            scan_pos = pos
+        # The preamble is never emitted, so don't keep it around
+        if sec_num is None and scan_pos > 1:
+            buf = buf[scan_pos - 1:]
+            scan_pos = 1
 
-    return sections_data
+    if sec_num is not None:
+        yield sec_num, buf[content_start:]
+
+def iter_sections(page_texts, act_name, profile=DEFAULT_PROFILE):
+    """
+    Yields section entries from page texts one at a time, each labelled
+    with its Entry_Type (body section, table of contents or footnote).
+    """
+    classifier = EntryClassifier()
+    for sec_num, content in iter_section_parts(iter_clean_pages(page_texts), SECTION_PATTERNS[profile]):
+        entry = build_section_entry(sec_num, content, act_name)
+        if entry:
+            entry["Entry_Type"] = classifier.classify(entry["Section"], entry["Applicable_Scenario"])
+            yield entry
+
+def extract_page_range(pdf_path, start, stop, digest, use_cache=True):
+    """
+    Extracts the raw text of pages [start, stop). Runs inside pool workers.
+    Returns (page texts, cache hits, cache misses, (wall s, cpu s)).
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    cache = PageTextCache(enabled=use_cache)
+    texts = cache.page_texts(pdf_path, start, stop, digest=digest)
+    return texts, cache.hits, cache.misses, (time.perf_counter() - wall, time.process_time() - cpu)
 
-def process_pdf(pdf_path, act_name):
+def parse_pages(page_texts, act_name, profile=DEFAULT_PROFILE):
+    """Runs the streaming section extractor over page texts in order."""
+    return list(iter_sections(page_texts, act_name, profile))
+
+def iter_pdf_sections(pdf_path, act_name, cache=None, profile=DEFAULT_PROFILE, digest=None, failed=None):
+    """Yields a PDF's section entries as they are extracted. On an error pdf_path is added to failed."""
     print(f"Processing {pdf_path}...")
     try:
-        reader = PdfReader(pdf_path)
-        full_text = ""
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
-        
-        # Pre-process text to fix line breaks within sentences
-        full_text = clean_text(full_text)
-        
-        return extract_section_data(full_text, act_name)
+        if cache is None:
+            cache = PageTextCache(enabled=False)
+        page_texts = cache.iter_page_texts(pdf_path, digest=digest)
+        yield from iter_sections(page_texts, act_name, profile)
     except Exception as e:
         print(f"Error processing {pdf_path}: {e}")
-        return []
+        if failed is not None:
+            failed.add(pdf_path)
+
+def process_pdf(pdf_path, act_name, cache=None, profile=DEFAULT_PROFILE):
+    return list(iter_pdf_sections(pdf_path, act_name, cache, profile))
+
+def process_pdfs_parallel(jobs, workers, cache, failed=None):
+    """
+    Extracts several acts (registry work items) with a process pool.
+    Every PDF is split into page ranges of PAGES_PER_TASK pages, all ranges of
+    all files are queued on one pool, and each file's pages are merged back in
+    page order once its last range finishes. Returns {pdf_path: entries};
+    the paths of the files that could not be extracted are added to failed.
+    """
+    results = {}
+    chunks = {}    # pdf_path -> {start: [page texts]}
+    pending = {}   # pdf_path -> number of ranges not yet finished
+    page_time = {} # pdf_path -> wall seconds its page ranges took in the workers
+    failed = set() if failed is None else failed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for act in jobs:
+            pdf_path = act.path
+            print(f"Processing {pdf_path}...")
+            if PROFILER is not None:
+                PROFILER.file = os.path.basename(pdf_path)
+            try:
+                digest = act.checksum()
+                num_pages = cache.page_count(pdf_path, digest)
+            except Exception as e:
+                print(f"Error processing {pdf_path}: {e}")
+                results[pdf_path] = []
+                failed.add(pdf_path)
+                continue
+            chunks[pdf_path] = {}
+            pending[pdf_path] = 0
+            page_time[pdf_path] = 0.0
+            for start in range(0, num_pages, PAGES_PER_TASK):
+                stop = min(start + PAGES_PER_TASK, num_pages)
+                fut = pool.submit(extract_page_range, pdf_path, start, stop, digest, cache.enabled)
+                futures[fut] = (act, start)
+                pending[pdf_path] += 1
+            if pending[pdf_path] == 0:
+                results[pdf_path] = parse_pages([], act.name, act.profile)
+
+        for fut in as_completed(futures):
+            act, start = futures[fut]
+            pdf_path = act.path
+            try:
+                texts, hits, misses, (wall, cpu) = fut.result()
+                chunks[pdf_path][start] = texts
+                page_time[pdf_path] += wall
+                cache.hits += hits
+                cache.misses += misses
+                if PROFILER is not None:
+                    # Summed over workers, so it can exceed the elapsed time
+                    PROFILER.add(PAGE_STAGE, wall, cpu, items=len(texts), file=os.path.basename(pdf_path))
+            except Exception as e:
+                if pdf_path not in failed:
+                    print(f"Error processing {pdf_path}: {e}")
+                failed.add(pdf_path)
+            pending[pdf_path] -= 1
+            if pending[pdf_path]:
+                continue
+
+            # Last range of this file is in: stitch pages back in order
+            results[pdf_path] = []
+            parse_time = 0.0
+            if pdf_path not in failed:
+                page_texts = []
+                for key in sorted(chunks[pdf_path]):
+                    page_texts.extend(chunks[pdf_path][key])
+                if PROFILER is not None:
+                    PROFILER.file = os.path.basename(pdf_path)
+                t0 = time.perf_counter()
+                try:
+                    results[pdf_path] = parse_pages(page_texts, act.name, act.profile)
+                except Exception as e:
+                    print(f"Error processing {pdf_path}: {e}")
+                    failed.add(pdf_path)
+                parse_time = time.perf_counter() - t0
+            del chunks[pdf_path]
+            # Page time is summed over the workers that read the file's ranges
+            print(f"  {os.path.basename(pdf_path)}: {len(results[pdf_path])} entries in "
+                  f"{page_time[pdf_path] + parse_time:.2f}s ({page_time[pdf_path]:.2f}s page text, {parse_time:.2f}s parsing)")
+
+    return results
+
+def stream_pdf(act, cache, failed=None):
+    """Yields an act's entries and reports its wall-clock time once exhausted."""
+    t0 = time.perf_counter()
+    count = 0
+    if PROFILER is not None:
+        PROFILER.file = os.path.basename(act.path)
+    for entry in iter_pdf_sections(act.path, act.name, cache, act.profile, act.digest, failed):
+        count += 1
+        yield entry
+    print(f"  {os.path.basename(act.path)}: {count} entries in {time.perf_counter() - t0:.2f}s")
+
+def iter_job_results(jobs, workers, cache, failed=None):
+    """
+    Extracts every job (a registry Act with its path resolved) and yields
+    (act, entries) in job order. In serial mode the entries are a
+    generator, so records stream straight through to the writer. The paths
+    of the acts whose extraction raised are added to failed (once their
+    entries are exhausted).
+    """
+    if workers > 1:
+        results = process_pdfs_parallel(jobs, workers, cache, failed)
+        for act in jobs:
+            yield act, results.pop(act.path)
+    else:
+        for act in jobs:
+            yield act, stream_pdf(act, cache, failed)
+
+# --- Stage profiling ---
+# With --profile-stages the pipeline's generators, functions and compiled
+# patterns are swapped for timed wrappers before the run; without it nothing
+# is patched and the only cost is a per-file check of PROFILER.
+
+PROFILER = None
+PAGE_STAGE = "page text"
+SECTION_STAGE = "sections"
+
+def install_profiler(profiler):
+    """Wraps every pipeline stage and regex in profiler timers."""
+    global PROFILER
+    PROFILER = profiler
+    module = sys.modules[__name__]
+    p = profiler
+    p.patch(pdf_cache, "extract_page_text", p.wrap(pdf_cache.extract_page_text, "pypdf extract_text"))
+    p.patch(PageTextCache, "iter_page_texts", p.wrap_generator(PageTextCache.iter_page_texts, PAGE_STAGE))
+    p.patch(PageTextCache, "_read", p.wrap(PageTextCache._read, "page cache read"))
+    p.patch(PageTextCache, "_write", p.wrap(PageTextCache._write, "page cache write"))
+    p.patch(module, "iter_clean_pages", p.wrap_generator(iter_clean_pages, "whitespace cleanup"))
+    p.patch(module, "iter_section_parts", p.wrap_generator(iter_section_parts, "section split"))
+    p.patch(module, "iter_sections", p.wrap_generator(iter_sections, SECTION_STAGE))
+    p.patch(module, "build_section_entry", p.wrap(build_section_entry, "build entry"))
+    p.patch(CLAUSE_MATCHER, "match", p.wrap(CLAUSE_MATCHER.match, "penalty/relief clauses"))
+    p.patch(EntryClassifier, "classify", p.wrap(EntryClassifier.classify, "entry type"))
+    p.patch(RecordWriter, "write", p.wrap(RecordWriter.write, "write output"))
+
+    for owner, name in [(module, "SECTION_START"), (module, "WHITESPACE"), (module, "CASE_FOLD_SPECIAL"),
+                        (section_index, "ARRANGEMENT"), (section_index, "NOTE_START"),
+                        (section_index, "BODY_MARKER")]:
+        p.patch(owner, name, TimedPattern(p, getattr(owner, name), f"regex {name}"))
+    # iter_sections looks the split pattern up by profile, so the table's
+    # patterns need wrapping too (the default profile's is SECTION_START)
+    p.patch(module, "SECTION_PATTERNS", {
+        profile: TimedPattern(p, pattern, "regex SECTION_START" if profile == DEFAULT_PROFILE
+                              else f"regex SECTION_PATTERNS[{profile}]")
+        for profile, pattern in SECTION_PATTERNS.items()})
+    p.patch(CLAUSE_MATCHER, "scanner", TimedPattern(p, CLAUSE_MATCHER.scanner, "regex clause keywords"))
+    p.patch(CLAUSE_MATCHER, "terminator", TimedPattern(p, CLAUSE_MATCHER.terminator, "regex clause terminator"))
+    p.patch(CLAUSE_MATCHER, "slow_patterns", [TimedPattern(p, pat, "regex clause keywords (IGNORECASE)")
+                                              for pat in CLAUSE_MATCHER.slow_patterns])
+
+def uninstall_profiler():
+    global PROFILER
+    if PROFILER is not None:
+        PROFILER.restore()
+        PROFILER = None
+
+# Functions whose source defines the extraction rules. Editing any of them
+# (e.g. tuning a regex) changes extractor_version() and invalidates shards.
+EXTRACTOR_RULES = [build_section_entry, iter_clean_pages, iter_section_parts, iter_sections,
+                   ClauseMatcher, PENALTY_KEYWORDS, RELIEF_KEYWORDS,
+                   [(profile, pattern.pattern) for profile, pattern in sorted(SECTION_PATTERNS.items())],
+                   EntryClassifier, ARRANGEMENT.pattern, NOTE_START.pattern, BODY_MARKER.pattern]
+
+def extractor_version():
+    """Hash of the extraction rules' source code and keyword lists."""
+    h = hashlib.sha256()
+    for rule in EXTRACTOR_RULES:
+        source = repr(rule) if isinstance(rule, (list, str)) else inspect.getsource(rule)
+        h.update(source.encode('utf-8'))
+    return h.hexdigest()[:16]
+
+def shard_filename(act_name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', act_name).strip('_') + ".json"
+
+def load_manifest():
+    try:
+        with open(SHARD_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def run_incremental(jobs, workers, cache, writer, order=None, failed=None):
+    """
+    Re-extracts only the acts whose PDF or extraction rules changed since the
+    last incremental run, writing one shard per act, and streams the entries
+    of all acts to writer in job order. With order (every act name in the
+    registry, in registry order) the shards of the acts that are not jobs
+    this run (not selected, or their file is missing) are passed through in
+    that order and kept; only shards of acts that left the registry are
+    removed. An act whose extraction raised keeps its old shard and
+    manifest entry, so the next run retries it, and its path is added to
+    failed.
+    """
+    failed = set() if failed is None else failed
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    manifest = load_manifest()
+    version = extractor_version()
+
+    stale = []
+    for act in jobs:
+        record = manifest.get(act.name)
+        if (record and record["source_sha256"] == act.checksum()
+                and record["extractor_version"] == version
+                and os.path.exists(os.path.join(SHARD_DIR, record["shard"]))):
+            print(f"Up to date: {act.name}")
+            continue
+        stale.append(act)
+
+    stale_results = iter_job_results(stale, workers, cache, failed)
+    stale_set = set(stale)
+    selected = {act.name: act for act in jobs}
+    order = order or list(selected)
+    for act_name in order:
+        act = selected.get(act_name)
+        if act is None:
+            # Not selected or no file this run: reuse its shard without opening the PDF
+            record = manifest.get(act_name)
+            if record and os.path.exists(os.path.join(SHARD_DIR, record["shard"])):
+                writer.write_all(read_records(os.path.join(SHARD_DIR, record["shard"])))
+            continue
+        if act not in stale_set:
+            writer.write_all(read_records(os.path.join(SHARD_DIR, manifest[act_name]["shard"])))
+            continue
+
+        _, entries = next(stale_results)
+        shard = shard_filename(act_name)
+        shard_writer = RecordWriter(os.path.join(SHARD_DIR, shard))
+        try:
+            for entry in entries:
+                shard_writer.write(entry)
+                writer.write(entry)
+        except BaseException:
+            shard_writer.abort()
+            raise
+        if act.path in failed:
+            shard_writer.discard()
+            continue
+        shard_writer.close()
+        manifest[act_name] = {
+            "source_file": os.path.basename(act.path),
+            "source_sha256": act.checksum(),
+            "extractor_version": version,
+            "shard": shard,
+            "entries": shard_writer.count
+        }
+
+    # Forget acts that are no longer in the registry
+    active = set(order)
+    for act_name in list(manifest):
+        if act_name not in active:
+            shard_path = os.path.join(SHARD_DIR, manifest.pop(act_name)["shard"])
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+
+    with open(SHARD_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    print(f"Re-extracted {len(stale) - len(failed)} of {len(jobs)} act(s)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract sections, penalties and reliefs from act PDFs.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of extraction processes (1 = serial, 0 = one per CPU).")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="Act registry listing the PDFs to extract.")
+    parser.add_argument("--pdf-dir", help="Directory holding the act PDFs (default: pdf_dir in the registry).")
+    parser.add_argument("--act", action="append",
+                        help="Only extract this act (registry key or name, e.g. BNS; can be given several times). "
+                             "With --incremental the other acts' shards are kept and passed through.")
+    parser.add_argument("--update-pins", action="store_true",
+                        help="Extract acts whose PDF no longer matches the checksum pinned in the registry "
+                             "and pin the new checksum (by default the run stops).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-parse PDFs instead of using the page text cache.")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output as a pretty JSON array (default) or JSON Lines.")
+    parser.add_argument("--build-index", action="store_true",
+                        help=f"Rebuild the BM25 search index ({INDEX_FILE}) from the new output.")
+    parser.add_argument("--dedup", nargs="?", const=DEDUP_REPORT_FILE, metavar="REPORT",
+                        help="Drop table-of-contents entries, footnotes and boilerplate and merge near-duplicate "
+                             f"sections in the output; list what was removed in REPORT (default {DEDUP_REPORT_FILE}).")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Keep per-act shards in {SHARD_DIR}/ and only re-extract changed acts.")
+    parser.add_argument("--profile-stages", nargs="?", const=REPORT_FILE, metavar="REPORT",
+                        help=f"Time every pipeline stage and regex per file; print a table and write JSON to REPORT (default {REPORT_FILE}).")
+    parser.add_argument("--cprofile", nargs="?", const=CPROFILE_FILE, metavar="FILE",
+                        help=f"Run under cProfile, print the top functions and dump the stats to FILE (default {CPROFILE_FILE}).")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Trace memory allocations and print the peak and the largest allocation sites.")
+    return parser.parse_args()
 
 def main():
-    all_data = []
+    args = parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    cache = PageTextCache(enabled=not args.no_cache)
     
-    files = [f for f in os.listdir(PDF_DIR) if f.endswith('.pdf')]
-    
-    for filename in files:
-        if filename in FILE_ACT_MAP:
-            file_path = os.path.join(PDF_DIR, filename)
-            act_name = FILE_ACT_MAP[filename]
-            data = process_pdf(file_path, act_name)
-            all_data.extend(data)
+    # Only the selected acts' files are resolved and checked
+    registry = ActRegistry.load(args.registry, args.pdf_dir)
+    try:
+        jobs = list(registry.work_items(args.act, SECTION_PATTERNS, verify=not args.update_pins))
+    except ChecksumMismatch as e:
+        sys.exit(f"{e}, or pass --update-pins")
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.act and not args.incremental:
+        print("Only the selected act(s) will be in the output; add --incremental to keep the others")
+
+    output_file = output_path(OUTPUT_FILE, args.format)
+    if args.profile_stages:
+        install_profiler(StageProfiler())
+    if args.tracemalloc:
+        tracemalloc.start()
+    profile = cProfile.Profile() if args.cprofile else None
+    if profile:
+        profile.enable()
+
+    start, start_cpu = time.perf_counter(), time.process_time()
+    failed = set()
+    with RecordWriter(output_file, args.format) as writer:
+        if args.incremental:
+            run_incremental(jobs, workers, cache, writer, [act.name for act in registry.acts], failed)
         else:
-            print(f"Skipping unknown file: {filename}")
+            # Written in registry order so the output matches the serial run
+            for _, entries in iter_job_results(jobs, workers, cache, failed):
+                writer.write_all(entries)
+    elapsed, elapsed_cpu = time.perf_counter() - start, time.process_time() - start_cpu
+    print(f"Extracted {len(jobs)} file(s) with {workers} worker(s) in {elapsed:.2f}s")
+    print(cache.summary())
 
-    # Write to JSON
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, indent=4, ensure_ascii=False)
+    if profile:
+        profile.disable()
+        profile.dump_stats(args.cprofile)
+        print(f"\ncProfile (top {PROFILE_TOP} by cumulative time, full stats in {args.cprofile}):")
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    memory = None
+    if args.tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        top = snapshot.statistics("lineno")[:PROFILE_TOP]
+        memory = {"peak_mib": round(peak / (1 << 20), 3),
+                  "top_sites": [{"site": str(stat.traceback), "kib": round(stat.size / 1024, 1), "blocks": stat.count}
+                                for stat in top]}
+        print(f"\nPeak traced memory: {memory['peak_mib']:.1f} MiB; largest live allocation sites:")
+        for site in memory["top_sites"]:
+            print(f"  {site['kib']:10,.1f} KiB {site['blocks']:8,} blocks  {site['site']}")
+    if PROFILER is not None:
+        report = PROFILER.write_report(args.profile_stages, {
+            "run": {"files": len(jobs), "workers": workers, "wall_s": round(elapsed, 6),
+                    "cpu_s": round(elapsed_cpu, 6), "entries": writer.count},
+            "memory": memory
+        })
+        uninstall_profiler()
+        print()
+        print(format_report(report, PAGE_STAGE, SECTION_STAGE))
+        print(f"Stage report saved to {args.profile_stages}")
+    cache.evict()
     
-    print(f"Extraction complete. Data saved to {OUTPUT_FILE}")
-    print(f"Total entries extracted: {len(all_data)}")
+    print(f"Extraction complete. Data saved to {output_file}")
+    print(f"Total entries extracted: {writer.count}")
+
+    if args.update_pins:
+        repinned = [act for act in jobs if act.sha256 and act.checksum() != act.sha256 and act.path not in failed]
+        for act in repinned:
+            act.sha256 = act.checksum()
+            print(f"Pinned {act.key}: {act.sha256}")
+        if repinned:
+            registry.save(args.registry)
+
+    if args.dedup:
+        dedup_file(output_file, report_file=args.dedup)
+
+    # Canonical (act, section) lookup over the body sections, for citations
+    rebuild_section_index(output_file, SECTION_INDEX_FILE)
+
+    if args.build_index:
+        rebuild_index(output_file, INDEX_FILE)
+
+    if failed:
+        sys.exit(f"Extraction failed for {', '.join(sorted(failed))}; their entries in {output_file} are incomplete"
+                 + (" (the next --incremental run retries them)" if args.incremental else ""))
 
 if __name__ == "__main__":
     main()
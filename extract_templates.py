@@ -1,48 +1,134 @@
 
-import json
 import re
+import sys
+import json
+import argparse
 from pypdf import PdfReader
+from pdf_cache import PageTextCache, file_digest, page_literal_text
+from act_registry import REGISTRY_FILE, ActRegistry
+from json_output import FORMATS, RecordWriter, output_path
+from template_render import COMPILED_FILE, rebuild_compiled
 
 # Configuration
-BNSS_PDF = "/Users/nikhilkmenon/Desktop/Law_Lite/a2023-46.pdf"
+# The BNSS PDF is found through the act registry (acts.json) under this key
+BNSS_ACT = "BNSS"
 OUTPUT_FILE = "legal_templates.json"
 
-def extract_bnss_forms(pdf_path):
+# Forms are "FORM No. X", then the title in capitals on its own line, then the body
+BNSS_FORM = re.compile(r'(FORM\s+No\.\s*\d+)\s*\n+([A-Z\s\(\)]+)\n+(.*?)(?=(?:FORM\s+No\.\s*\d+)|\Z)', re.DOTALL | re.MULTILINE)
+
+# Section 173 (information in cognizable cases) is the FIR procedure; its
+# text runs up to the start of Section 174
+FIR_START = re.compile(r'173\.\s+Information\s+in\s+cognizable\s+cases\.—', re.IGNORECASE)
+FIR_SECTION = re.compile(FIR_START.pattern + r'(.*?)174\.', re.DOTALL | re.IGNORECASE)
+
+# Targeted mode: a first pass over the raw page content (no text decoding,
+# see page_literal_text) finds the pages with these markers, and is cached
+# per PDF. Bump LOCATOR_VERSION when the markers change.
+LOCATOR_VERSION = 1
+FORM_MARKER = re.compile(r'FORMNo\.\d')
+FIR_MARKER = re.compile(r'173\.Informationincognizablecases', re.IGNORECASE)
+
+def parse_bnss_forms(full_text):
+    """Parses the Forms/Templates defined in the BNSS Schedules out of its text."""
+    forms = {}
+    # Example: FORM No. 1 NOTICE FOR APPEARANCE BY THE POLICE
+    for match in BNSS_FORM.finditer(full_text):
+        form_num = match.group(1).strip() # FORM No. 1
+        form_title = match.group(2).strip() # NOTICE FOR ...
+        form_body = match.group(3).strip()
+        
+        # Map BNSS forms to user requests if possible
+        # User wants: Legal Notice, Consumer complaint, Rental, Employment, NDA, FIR, Cyber
+        
+        # BNSS forms are mainly criminal procedure (Summons, Warrants, Bonds)
+        # FIR filing steps -> Section 173 of BNSS describes "Information in cognizable cases".
+        
+        key = f"{form_num}: {form_title}"
+        forms[key] = form_body
+    return forms
+
+def extract_bnss_forms(pdf_path, cache=None):
     """
     Extracts text from the PDF and parses out Forms/Templates defined in the Schedules/Amendments.
     BNSS typically has forms at the end.
     """
     forms = {}
+    full_text = ""
+    if cache is None:
+        cache = PageTextCache(enabled=False)
     try:
-        reader = PdfReader(pdf_path)
-        full_text = ""
-        for page in reader.pages:
-            full_text += page.extract_text() + "\n"
-        
-        # Regex to find Forms. Usually "FORM No. X" followed by Title
-        # Example: FORM No. 1 NOTICE FOR APPEARANCE BY THE POLICE
-        
-        form_matches = re.finditer(r'(FORM\s+No\.\s*\d+)\s*\n+([A-Z\s\(\)]+)\n+(.*?)(?=(?:FORM\s+No\.\s*\d+)|\Z)', full_text, re.DOTALL | re.MULTILINE)
-        
-        for match in form_matches:
-            form_num = match.group(1).strip() # FORM No. 1
-            form_title = match.group(2).strip() # NOTICE FOR ...
-            form_body = match.group(3).strip()
-            
-            # Map BNSS forms to user requests if possible
-            # User wants: Legal Notice, Consumer complaint, Rental, Employment, NDA, FIR, Cyber
-            
-            # BNSS forms are mainly criminal procedure (Summons, Warrants, Bonds)
-            # FIR filing steps -> Section 173 of BNSS describes "Information in cognizable cases".
-            
-            key = f"{form_num}: {form_title}"
-            forms[key] = form_body
-            
+        for text in cache.page_texts(pdf_path):
+            full_text += text + "\n"
+        forms = parse_bnss_forms(full_text)
     except Exception as e:
         print(f"Error reading BNSS PDF: {e}")
         
     return full_text, forms
 
+def extract_fir_steps(full_text):
+    """The text of BNSS Section 173, or None if it can't be found."""
+    fir_match = FIR_SECTION.search(full_text)
+    return fir_match.group(1).strip() if fir_match else None
+
+def locate_bnss_pages(pdf_path, cache, digest):
+    """{"pages": page count, "forms": pages with a form heading, "fir": pages that may start Section 173}."""
+    def scan():
+        reader = PdfReader(pdf_path)
+        located = {"pages": len(reader.pages), "forms": [], "fir": []}
+        for i in range(len(reader.pages)):
+            raw = page_literal_text(reader, i)
+            if FORM_MARKER.search(raw):
+                located["forms"].append(i)
+            if FIR_MARKER.search(raw):
+                located["fir"].append(i)
+        return json.dumps(located)
+    return json.loads(cache.cached_entry(pdf_path, f"bnss-pages-v{LOCATOR_VERSION}.json", scan, digest))
+
+def extract_bnss_targeted(pdf_path, cache=None):
+    """
+    Finds the same forms and Section 173 text as extract_bnss_forms() and
+    extract_fir_steps() over the whole PDF, but decodes only the located
+    pages: from the page before the first form heading to the end, and
+    Section 173 up to the page where "174." follows it.
+    Returns (forms, FIR text or None), or None if the first pass found no
+    markers (e.g. fonts with custom encodings) and the caller should fall
+    back to decoding every page.
+    """
+    if cache is None:
+        cache = PageTextCache(enabled=False)
+    try:
+        digest = file_digest(pdf_path)
+        located = locate_bnss_pages(pdf_path, cache, digest)
+    except Exception as e:
+        print(f"Error scanning BNSS PDF: {e}")
+        return None
+    if not located["forms"] and not located["fir"]:
+        return None
+
+    forms = {}
+    if located["forms"]:
+        # One page early in case a heading is split across the page break
+        start = max(located["forms"][0] - 1, 0)
+        forms = parse_bnss_forms("".join(text + "\n" for text in
+                                         cache.iter_page_texts(pdf_path, start, located["pages"], digest)))
+
+    fir_steps = None
+    for page in located["fir"]:
+        text = cache.page_texts(pdf_path, page, page + 1, digest)[0] + "\n"
+        if not FIR_START.search(text):
+            continue    # e.g. the entry in the arrangement of sections
+        # The section starts here; read on until "174." follows it
+        fir_match = FIR_SECTION.search(text)
+        stop = page + 1
+        while not fir_match and stop < located["pages"]:
+            text += cache.page_texts(pdf_path, stop, stop + 1, digest)[0] + "\n"
+            stop += 1
+            fir_match = FIR_SECTION.search(text)
+        fir_steps = fir_match.group(1).strip() if fir_match else None
+        break
+    return forms, fir_steps
+
 def generate_static_templates():
     """Returns standard templates for items not found in BNSS."""
     return {
@@ -141,17 +227,69 @@ Verification: Verified that contents are true...""",
 8. Visit nearest Cyber Cell if FIR registration is required by local police."""
     }
 
+def iter_template_records(templates, bnss_forms):
+    """Yields the output records: static/FIR templates first, then matching BNSS forms."""
+    for title, content in templates.items():
+        yield {
+            "Template_Name": title,
+            "Content": content
+        }
+        
+    # Append relevant extracted BNSS forms if they match "Legal Notice" broadly
+    # Form 1 is "NOTICE FOR APPEARANCE".
+    if "FORM No. 1" in bnss_forms: # This key might vary based on regex
+        # Finding keys
+        for key, val in bnss_forms.items():
+            if "NOTICE" in key or "SUMMONS" in key:
+                 yield {
+                     "Template_Name": f"BNSS {key}",
+                     "Content": val
+                 }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build legal_templates.json from static templates and BNSS forms.")
+    parser.add_argument("--bnss-pdf", help=f"Path to the BNSS PDF (default: the {BNSS_ACT} act in the registry).")
+    parser.add_argument("--registry", default=REGISTRY_FILE)
+    parser.add_argument("--pdf-dir", help="Directory holding the PDFs (default: pdf_dir in the registry).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-parse the PDF instead of using the page text cache.")
+    parser.add_argument("--full-scan", action="store_true",
+                        help="Decode every page of the BNSS PDF instead of only the located form and Section 173 pages.")
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="Output as a pretty JSON array (default) or JSON Lines.")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     templates = generate_static_templates()
+    cache = PageTextCache(enabled=not args.no_cache)
     
     # Extract FIR filing steps from BNSS PDF (Section 173)
-    full_text, bnss_forms = extract_bnss_forms(BNSS_PDF)
+    bnss_pdf = args.bnss_pdf
+    if bnss_pdf is None:
+        try:
+            bnss = next(ActRegistry.load(args.registry, args.pdf_dir).work_items([BNSS_ACT]), None)
+        except ValueError as e:
+            sys.exit(str(e))
+        bnss_pdf = bnss.path if bnss else None
+    # Without the PDF only the static templates are written
+    bnss_forms, fir_steps = {}, None
+    if bnss_pdf:
+        located = None if args.full_scan else extract_bnss_targeted(bnss_pdf, cache)
+        if located is None:
+            if not args.full_scan:
+                print("Could not locate the forms from the page content; decoding every page")
+            full_text, bnss_forms = extract_bnss_forms(bnss_pdf, cache)
+            fir_steps = extract_fir_steps(full_text)
+        else:
+            bnss_forms, fir_steps = located
+    print(cache.summary())
+    cache.evict()
     
     # Extract Section 173 text for FIR Steps
     # A simple regex to grab the block if possible, or search for "173. Information in cognizable cases"
-    fir_match = re.search(r'173\.\s+Information\s+in\s+cognizable\s+cases\.—(.*?)174\.', full_text, re.DOTALL | re.IGNORECASE)
-    if fir_match:
-        templates["FIR Filing Steps (BNSS Section 173)"] = fir_match.group(1).strip()
+    if fir_steps is not None:
+        templates["FIR Filing Steps (BNSS Section 173)"] = fir_steps
     else:
         # Fallback to general knowledge if extraction is messy
         templates["FIR Filing Steps (General)"] = "1. Visit Police Station having jurisdiction. 2. Give information orally or in writing to Officer-in-Charge. 3. Officer must reduce it to writing (BNSS Sec 173). 4. Informant must sign the report. 5. Receive a free copy of the FIR."
@@ -164,30 +302,14 @@ def main():
     # So we used the static one.
     
     # Consolidate
-    final_output = []
-    
-    for title, content in templates.items():
-        final_output.append({
-            "Template_Name": title,
-            "Content": content
-        })
+    output_file = output_path(OUTPUT_FILE, args.format)
+    with RecordWriter(output_file, args.format) as writer:
+        writer.write_all(iter_template_records(templates, bnss_forms))
         
-    # Append relevant extracted BNSS forms if they match "Legal Notice" broadly
-    # Form 1 is "NOTICE FOR APPEARANCE".
-    if "FORM No. 1" in bnss_forms: # This key might vary based on regex
-        # Finding keys
-        for key, val in bnss_forms.items():
-            if "NOTICE" in key or "SUMMONS" in key:
-                 final_output.append({
-                     "Template_Name": f"BNSS {key}",
-                     "Content": val
-                 })
+    print(f"Templates saved to {output_file}")
 
-    # Write to file
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(final_output, f, indent=4, ensure_ascii=False)
-        
-    print(f"Templates saved to {OUTPUT_FILE}")
+    # Placeholder segments and slots for template_render.py
+    rebuild_compiled(output_file, COMPILED_FILE)
 
 if __name__ == "__main__":
     main()
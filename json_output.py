@@ -0,0 +1,86 @@
+
+import os
+import json
+
+# Output formats shared by the extractor scripts.
+# "json"  - pretty JSON array, byte-identical to json.dump(records, f, indent=4, ensure_ascii=False)
+# "jsonl" - one compact JSON object per line (JSON Lines)
+FORMATS = ("json", "jsonl")
+PARTIAL_SUFFIX = ".partial"
+
+def output_path(path, fmt):
+    """Swaps the .json extension for .jsonl when writing JSON Lines."""
+    if fmt == "jsonl" and path.endswith(".json"):
+        return path + "l"
+    return path
+
+class RecordWriter:
+    """
+    Streams records to disk as they are produced.
+    Records go to <path>.partial and are flushed one by one, so a consumer can
+    tail the file and a crash late in a run keeps everything written so far.
+    close() fsyncs and atomically renames the partial file to <path>.
+    """
+
+    def __init__(self, path, fmt="json"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.count = 0
+        self.f = open(self.partial_path, 'w', encoding='utf-8')
+        if fmt == "json":
+            self.f.write("[")
+
+    def write(self, record):
+        if self.fmt == "jsonl":
+            self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            text = json.dumps(record, indent=4, ensure_ascii=False)
+            self.f.write(("," if self.count else "") + "\n    " + text.replace("\n", "\n    "))
+        self.count += 1
+        self.f.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        """Finishes the file and moves it into place."""
+        if self.fmt == "json":
+            self.f.write("\n]" if self.count else "]")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+        os.replace(self.partial_path, self.path)
+
+    def discard(self):
+        """Closes and deletes the partial file; the target file is left as it was."""
+        self.f.close()
+        os.remove(self.partial_path)
+
+    def abort(self):
+        """Closes without finalising; the records written so far stay in the .partial file."""
+        self.f.close()
+        print(f"Run aborted after {self.count} record(s); partial output kept in {self.partial_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+def read_records(path):
+    """Yields records from a .json array or a .jsonl file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
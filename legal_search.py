@@ -0,0 +1,192 @@
+
+import re
+import sys
+import json
+import math
+import time
+import heapq
+import operator
+import argparse
+from json_output import read_records
+from pdf_cache import file_digest
+from section_index import iter_entry_types
+
+# Configuration
+INPUT_FILE = "legal_data.json"
+INDEX_FILE = "legal_index.json"
+INDEX_VERSION = 2
+
+# Field weights (BM25F): a term in the Penalty or Relief clause says more
+# about what a section is for than the same term in the general text.
+FIELD_BOOSTS = {
+    "Applicable_Scenario": 1.0,
+    "Penalty": 2.0,
+    "Relief": 2.0,
+    "Act_Name": 0.5
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each either few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself neither no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to too
+under until up upon very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+shall may said thereof therein thereto hereby herein hereinafter whereof whereas section sections sub
+clause clauses act acts provided provision provisions chapter
+""".split())
+
+TOKEN = re.compile(r'[a-z0-9]+')
+
+def stem(token):
+    """Very light suffix stripping so that "cheated", "cheating" and "cheat" meet."""
+    if token.isdigit():
+        return token
+    if token.endswith("ies") and len(token) > 5:
+        return token[:-3] + "y"
+    for suffix in ("ing", "ed", "s"):
+        if token.endswith(suffix) and not token.endswith("ss") and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+    if token.endswith("e") and len(token) > 3:
+        token = token[:-1]
+    return token
+
+def tokenize(text):
+    return [stem(t) for t in TOKEN.findall(str(text).lower()) if t not in STOPWORDS]
+
+def build_index(records, source=None):
+    """
+    Builds the index as a plain dict over the body sections (table-of-contents
+    entries and footnotes are left out, as in section_index). Postings store
+    the precomputed BM25 contribution of the term to each document
+    ("impact"), so a query only has to add up impacts.
+    """
+    records = list(records)
+    records = [record for record, entry_type in zip(records, iter_entry_types(records)) if entry_type == "section"]
+    doc_tf = []
+    doc_len = []
+    df = {}
+    for record in records:
+        tf = {}
+        length = 0.0
+        for field, boost in FIELD_BOOSTS.items():
+            tokens = tokenize(record.get(field, ""))
+            length += boost * len(tokens)
+            for t in tokens:
+                tf[t] = tf.get(t, 0.0) + boost
+        for t in tf:
+            df[t] = df.get(t, 0) + 1
+        doc_tf.append(tf)
+        doc_len.append(length)
+
+    n = len(records)
+    avgdl = (sum(doc_len) / n) if n else 0.0
+    postings = {}
+    for doc_id, tf in enumerate(doc_tf):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[doc_id] / avgdl) if avgdl else BM25_K1
+        for t, f in tf.items():
+            idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+            impact = idf * f * (BM25_K1 + 1) / (f + norm)
+            entry = postings.setdefault(t, [[], []])
+            entry[0].append(doc_id)
+            entry[1].append(round(impact, 4))
+
+    return {
+        "version": INDEX_VERSION,
+        "source": source,
+        "source_sha256": file_digest(source) if source else None,
+        "field_boosts": FIELD_BOOSTS,
+        "bm25": {"k1": BM25_K1, "b": BM25_B, "avgdl": avgdl},
+        "records": records,
+        "postings": postings
+    }
+
+def write_index(index, path=INDEX_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+def rebuild_index(input_file=INPUT_FILE, index_file=INDEX_FILE):
+    """Builds the index from an extractor output file (.json or .jsonl) and saves it."""
+    t0 = time.perf_counter()
+    index = build_index(read_records(input_file), source=input_file)
+    write_index(index, index_file)
+    print(f"Indexed {len(index['records'])} sections ({len(index['postings'])} terms) "
+          f"into {index_file} in {time.perf_counter() - t0:.2f}s")
+    return index
+
+class LegalSearchIndex:
+    """Loaded BM25 index over legal_data.json sections."""
+
+    def __init__(self, index):
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {index.get('version')}")
+        self.records = index["records"]
+        self.postings = index["postings"]
+        self.source_sha256 = index.get("source_sha256")
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def search(self, query, k=10):
+        """Returns up to k (score, record) pairs, best first (ties: lower doc id)."""
+        # Sparse accumulator: only the documents the query's postings touch get
+        # a score, so a query costs O(postings read) rather than O(corpus).
+        scores = {}
+        get = scores.get
+        for t in set(tokenize(query)):
+            entry = self.postings.get(t)
+            if not entry:
+                continue
+            for doc_id, impact in zip(entry[0], entry[1]):
+                scores[doc_id] = get(doc_id, 0.0) + impact
+        # (score, -doc id) tuples: the negated id puts the lower doc id first on ties
+        top = heapq.nlargest(k, zip(scores.values(), map(operator.neg, scores)))
+        return [(score, self.records[-neg_id]) for score, neg_id in top if score > 0]
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 search over extracted legal sections.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the index from extractor output.")
+    build.add_argument("--input", default=INPUT_FILE, help="legal_data.json or .jsonl")
+    build.add_argument("--index", default=INDEX_FILE)
+
+    query = sub.add_parser("query", help="Find the sections that best match a problem description.")
+    query.add_argument("text", help="Free-text problem description.")
+    query.add_argument("-k", type=int, default=5, help="Number of results.")
+    query.add_argument("--index", default=INDEX_FILE)
+    query.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        rebuild_index(args.input, args.index)
+        return
+
+    t0 = time.perf_counter()
+    index = LegalSearchIndex.load(args.index)
+    t1 = time.perf_counter()
+    results = index.search(args.text, args.k)
+    t2 = time.perf_counter()
+
+    if args.json:
+        json.dump([dict(record, Score=round(score, 4)) for score, record in results],
+                  sys.stdout, indent=4, ensure_ascii=False)
+        print()
+    else:
+        for rank, (score, record) in enumerate(results, 1):
+            print(f"{rank}. [{score:.2f}] {record['Act_Name']} - Section {record['Section']}")
+            print(f"   {record['Applicable_Scenario'][:200]}")
+            if record.get("Penalty"):
+                print(f"   Penalty: {record['Penalty'][:160]}")
+            if record.get("Relief"):
+                print(f"   Relief: {record['Relief'][:160]}")
+    print(f"Loaded index in {(t1 - t0) * 1000:.1f} ms, query took {(t2 - t1) * 1000:.2f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+from snapshot import load_records, close_records
+from legal_search import LegalSearchIndex, build_index
+from section_index import SectionIndex, build_section_index
+from extract_crime_data import DEFAULT_ENTRY, map_article_to_legal_issue
+from advocate_ranking import RANKING_FILE, load_or_build
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 8080
+LEGAL_DATA_FILE = "legal_data.json"
+PROBLEMS_FILE = "problem_solution_data.json"
+TEMPLATES_FILE = "legal_templates.json"
+ADVOCATES_FILE = "indian_advocates_case_history_dataset.csv"
+CACHE_SIZE = 4096           # responses kept in the LRU cache
+RELOAD_INTERVAL = 2.0       # seconds between checks for changed data files
+MAX_BODY_BYTES = 1 << 20
+MAX_RESULTS = 100
+
+# A long-running HTTP/1.1 JSON service over the scripts' outputs. Every
+# data file is parsed once at startup into the same structures the batch
+# tools use (SectionIndex, the BM25 index, the advocate ranking); when
+# legal_data.snap holds a current copy of legal_data.json the indexes keep
+# its lazy records and the file stays mapped until the next reload. Responses
+# are kept in an LRU cache keyed on path and parameters, and a watcher
+# reloads a file in a worker thread when its mtime or size changes, then
+# swaps it in and clears the cache. Stdlib only (asyncio streams).
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+class RequestError(Exception):
+    """An error response: HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ResponseCache:
+    """LRU cache of encoded responses."""
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        payload = self.entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key, payload):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = payload
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
+
+def file_stamp(path):
+    """(mtime, size) of a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def load_sections(path):
+    # The indexes hold the records, so they stay open (LegalData closes them on reload)
+    records = load_records(path)
+    try:
+        return {"sections": SectionIndex(build_section_index(records)),
+                "search": LegalSearchIndex(build_index(records)), "records": records}
+    except BaseException:
+        close_records(records)
+        raise
+
+def load_problems(path):
+    # Either mapped articles or ProblemAggregator records with a Count
+    counts = Counter()
+    records = load_records(path)
+    try:
+        for record in records:
+            counts[record["Problem_Type"]] += record.get("Count", 1)
+    finally:
+        close_records(records)
+    return {"problem_counts": counts}
+
+def load_templates(path):
+    records = load_records(path)
+    try:
+        return {"templates": {t["Template_Name"]: t["Content"] for t in records}}
+    finally:
+        close_records(records)
+
+def load_advocates(path):
+    # Takes in appended CSV rows incrementally (see advocate_ranking.update)
+    return {"advocates": load_or_build(RANKING_FILE, path)}
+
+class LegalData:
+    """The loaded data files and the mtime/size each was loaded at."""
+
+    LOADERS = {"sections": load_sections, "problems": load_problems,
+               "templates": load_templates, "advocates": load_advocates}
+
+    def __init__(self, paths):
+        self.paths = paths      # source name -> file
+        self.stamps = {}
+        self.failed = {}        # source name -> stamp that failed to load
+        self.records = {}       # source name -> records the loaded structures keep (see load_records)
+        self.sections = None
+        self.search = None
+        self.problem_counts = Counter()
+        self.templates = {}
+        self.advocates = None
+
+    def load(self, name):
+        """(stamp, attributes) for one source; runs in a worker thread on reload."""
+        path = self.paths[name]
+        stamp = file_stamp(path)    # taken first, so a write during the load is seen next time
+        return stamp, self.LOADERS[name](path)
+
+    def apply(self, name, stamp, values):
+        values = dict(values)
+        previous = self.records.pop(name, None)
+        if "records" in values:
+            self.records[name] = values.pop("records")
+        for attr, value in values.items():
+            setattr(self, attr, value)
+        self.stamps[name] = stamp
+        self.failed.pop(name, None)
+        if previous is not None:
+            close_records(previous)
+
+    def close(self):
+        for records in self.records.values():
+            close_records(records)
+        self.records.clear()
+
+    def load_all(self):
+        for name in self.paths:
+            t0 = time.perf_counter()
+            self.apply(name, *self.load(name))
+            print(f"Loaded {name} from {self.paths[name]} in {time.perf_counter() - t0:.2f}s")
+
+    def changed(self):
+        """Sources whose file changed since it was loaded (and did not already fail as is)."""
+        names = []
+        for name, path in self.paths.items():
+            stamp = file_stamp(path)
+            if stamp is not None and stamp != self.stamps.get(name) and stamp != self.failed.get(name):
+                names.append(name)
+        return names
+
+def get_param(params, *names, default=None):
+    for name in names:
+        value = params.get(name)
+        if value not in (None, ""):
+            return value
+    return default
+
+def int_param(params, name, default, lo=1, hi=MAX_RESULTS):
+    value = params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"{name} must be an integer")
+    if not lo <= value <= hi:
+        raise RequestError(400, f"{name} must be between {lo} and {hi}")
+    return value
+
+class LegalService:
+    """Request handlers over LegalData, with the response cache."""
+
+    def __init__(self, data, cache_size=CACHE_SIZE):
+        self.data = data
+        self.cache = ResponseCache(cache_size)
+        self.started = time.time()
+        self.requests = 0
+        self.reloads = 0
+        # path -> (handler, cacheable)
+        self.routes = {
+            "/health": (self.health, False),
+            "/sections": (self.section_lookup, True),
+            "/classify": (self.classify, True),
+            "/templates": (self.template_fetch, True),
+            "/advocates": (self.advocate_search, True),
+        }
+
+    def health(self, params):
+        return {"status": "ok", "uptime_s": round(time.time() - self.started, 1), "requests": self.requests,
+                "reloads": self.reloads, "cache": self.cache.stats(),
+                "sources": {name: self.data.paths[name] for name in self.data.stamps}}
+
+    def section_lookup(self, params):
+        """
+        ?act=IPC&section=420 (or ?cite=IPC 420): the section, following the
+        IPC <-> BNS table if needed. ?law=<Applicable_Law text>: every cited
+        section. ?q=<text>&k=5: BM25 search over all sections.
+        """
+        cite = get_param(params, "cite")
+        act, section = get_param(params, "act"), get_param(params, "section")
+        if cite:
+            act, _, section = cite.strip().rpartition(" ")
+        if act and section:
+            if self.data.sections.act_name(act) is None:
+                raise RequestError(404, f"Unknown act: {act}")
+            results = [dict(record, Via=via) for record, via in self.data.sections.resolve(act, section)]
+            if not results:
+                raise RequestError(404, f"No section {section} in {act}")
+            return {"Sections": results}
+        law = get_param(params, "law")
+        if law:
+            return {"Sections": self.data.sections.resolve_citation(law)}
+        query = get_param(params, "q")
+        if query:
+            k = int_param(params, "k", 5)
+            return {"Sections": [dict(record, Score=round(score, 4))
+                                 for score, record in self.data.search.search(query, k)]}
+        raise RequestError(400, "Give act and section, cite, law or q")
+
+    def classify(self, params):
+        """?heading=...&summary=...: the problem category, its cited sections and how often it was reported."""
+        heading = get_param(params, "heading", "title", default="")
+        summary = get_param(params, "summary", "description", default="")
+        if not heading and not summary:
+            raise RequestError(400, "Give heading and/or summary")
+        mapping = map_article_to_legal_issue(heading, summary)
+        result = dict(mapping or DEFAULT_ENTRY, Matched=mapping is not None)
+        result.pop("Source_Heading", None)
+        result["Reported_Cases"] = self.data.problem_counts.get(result["Problem_Type"], 0)
+        result["Cited_Sections"] = self.data.sections.resolve_citation(result["Applicable_Law"])
+        return result
+
+    def template_fetch(self, params):
+        """No parameters: the template names. ?name=...: that template (or the first whose name starts so)."""
+        name = get_param(params, "name")
+        templates = self.data.templates
+        if not name:
+            return {"Templates": list(templates)}
+        if name not in templates:
+            name = next((t for t in templates if t.startswith(name)), None)
+            if name is None:
+                raise RequestError(404, f"No template named {params['name']!r}")
+        return {"Template_Name": name, "Content": templates[name]}
+
+    def advocate_search(self, params):
+        """?specialization=&state=&city=&court_level=&k=5: best advocates and the group's aggregates."""
+        values = [get_param(params, name) for name in ("specialization", "state", "city", "court_level")]
+        k = int_param(params, "k", 5)
+        try:
+            advocates = self.data.advocates.recommend(*values, k=k)
+            stats = self.data.advocates.stats(*values)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        return {"Advocates": advocates, "Stats": stats}
+
+    def respond(self, method, target, body):
+        """(status, JSON payload bytes) for one request."""
+        self.requests += 1
+        url = urlsplit(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            return 404, encode({"error": f"Unknown path: {url.path}"})
+        handler, cacheable = route
+        if method == "POST":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                return 400, encode({"error": "Body must be a JSON object"})
+            if not isinstance(params, dict):
+                return 400, encode({"error": "Body must be a JSON object"})
+            params = {k: str(v) for k, v in params.items() if v is not None}
+        elif method == "GET":
+            params = dict(parse_qsl(url.query))
+        else:
+            return 405, encode({"error": f"Method not allowed: {method}"})
+
+        key = (url.path, tuple(sorted(params.items())))
+        if cacheable:
+            payload = self.cache.get(key)
+            if payload is not None:
+                return 200, payload
+        try:
+            payload = encode(handler(params))
+        except RequestError as e:
+            return e.status, encode({"error": str(e)})
+        if cacheable:
+            self.cache.put(key, payload)
+        return 200, payload
+
+    async def handle_connection(self, reader, writer):
+        """Serves HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await send(writer, 400, encode({"error": "Malformed request line"}), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await send(writer, 413, encode({"error": "Request body too large"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = self.respond(method.upper(), target, body)
+                except Exception as e:
+                    print(f"Error handling {method} {target}: {e!r}", file=sys.stderr)
+                    status, payload = 500, encode({"error": "Internal error"})
+                await send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass    # client went away, or a line longer than the stream limit
+        finally:
+            writer.close()
+
+    async def watch(self, interval):
+        """Reloads changed data files in a worker thread and swaps them in."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            for name in self.data.changed():
+                t0 = time.perf_counter()
+                try:
+                    stamp, values = await loop.run_in_executor(None, self.data.load, name)
+                except Exception as e:
+                    self.data.failed[name] = file_stamp(self.data.paths[name])
+                    print(f"Reloading {name} failed ({e!r}); keeping the previous data", file=sys.stderr)
+                    continue
+                self.data.apply(name, stamp, values)
+                self.cache.clear()
+                self.reloads += 1
+                print(f"Reloaded {name} from {self.data.paths[name]} in {time.perf_counter() - t0:.2f}s")
+
+def encode(result):
+    return json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+async def send(writer, status, payload, keep_alive):
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + payload)
+    await writer.drain()
+
+async def serve(service, host, port, reload_interval):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    watcher = asyncio.create_task(service.watch(reload_interval)) if reload_interval > 0 else None
+    print(f"Serving on http://{host}:{port} (sections, classify, templates, advocates, health)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher:
+            watcher.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON service over the legal data files.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--legal-data", default=LEGAL_DATA_FILE)
+    parser.add_argument("--problems", default=PROBLEMS_FILE)
+    parser.add_argument("--templates", default=TEMPLATES_FILE)
+    parser.add_argument("--advocates", default=ADVOCATES_FILE)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="Responses kept in the LRU cache (0 = off).")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL,
+                        help="Seconds between checks for changed data files (0 = never reload).")
+    args = parser.parse_args()
+
+    data = LegalData({"sections": args.legal_data, "problems": args.problems,
+                      "templates": args.templates, "advocates": args.advocates})
+    data.load_all()
+    try:
+        asyncio.run(serve(LegalService(data, args.cache_size), args.host, args.port, args.reload_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        data.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+
+import os
+import re
+import hashlib
+import pypdf
+from pypdf import PdfReader
+
+# Configuration
+# Extracted page text is stored here, keyed by PDF content hash, page index
+# and pypdf version, so tuning the parsing regexes never re-decodes a PDF.
+CACHE_DIR = ".page_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Literal string operands "(...)" in a page content stream, and their escapes
+LITERAL_STRING = re.compile(rb'\(((?:\\.|[^\\()])*)\)', re.DOTALL)
+LITERAL_ESCAPE = re.compile(rb'\\([0-7]{1,3}|.)', re.DOTALL)
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def extract_page_text(reader, index):
+    """pypdf text of one page ("" for pages without text)."""
+    return reader.pages[index].extract_text() or ""
+
+def page_literal_text(reader, index):
+    """
+    The page's literal strings joined with all whitespace removed, without
+    font decoding or layout. Far cheaper than extract_text() and enough to
+    find ASCII markers ("FORM No. 1" -> "FORMNo.1") in PDFs with standard
+    font encodings; callers must cope with it finding nothing.
+    """
+    contents = reader.pages[index].get_contents()
+    if contents is None:
+        return ""
+    data = b"".join(LITERAL_STRING.findall(contents.get_data()))
+    data = LITERAL_ESCAPE.sub(lambda m: b"" if m.group(1)[:1].isdigit() else m.group(1), data)
+    return re.sub(r'\s+', '', data.decode('latin-1'))
+
+class PageTextCache:
+    """
+    Size-bounded on-disk cache of pypdf page text shared by the extractors.
+    Every page is one small file; reads touch the file's mtime so that
+    evict() can drop the least recently used pages first.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, digest, name):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}-pypdf{pypdf.__version__}-{name}")
+
+    def _read(self, path):
+        if not self.enabled:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8', errors='surrogatepass') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return text
+
+    def _write(self, path, text):
+        if not self.enabled:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', errors='surrogatepass') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def page_count(self, pdf_path, digest=None):
+        """Number of pages in the PDF, cached alongside the page text."""
+        digest = digest or file_digest(pdf_path)
+        path = self._entry_path(digest, "pages")
+        cached = self._read(path)
+        if cached is not None:
+            return int(cached)
+        count = len(PdfReader(pdf_path).pages)
+        self._write(path, str(count))
+        return count
+
+    def cached_entry(self, pdf_path, name, build, digest=None):
+        """Text stored under name for this PDF; build() makes it on a miss."""
+        digest = digest or file_digest(pdf_path)
+        path = self._entry_path(digest, name)
+        text = self._read(path)
+        if text is None:
+            text = build()
+            self._write(path, text)
+        return text
+
+    def page_texts(self, pdf_path, start=0, stop=None, digest=None):
+        """
+        Returns the extracted text of pages [start, stop) in page order.
+        The PDF is only opened if at least one page is missing from the cache.
+        """
+        return list(self.iter_page_texts(pdf_path, start, stop, digest))
+
+    def iter_page_texts(self, pdf_path, start=0, stop=None, digest=None):
+        """Yields page texts one at a time; see page_texts()."""
+        digest = digest or file_digest(pdf_path)
+        if stop is None:
+            stop = self.page_count(pdf_path, digest)
+
+        reader = None
+        for i in range(start, stop):
+            path = self._entry_path(digest, f"{i}.txt")
+            text = self._read(path)
+            if text is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if reader is None:
+                    reader = PdfReader(pdf_path)
+                text = extract_page_text(reader, i)
+                self._write(path, text)
+            yield text
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        if not self.enabled or not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self):
+        if not self.enabled:
+            return "Page cache: disabled"
+        return f"Page cache: {self.hits} hit(s), {self.misses} miss(es)"
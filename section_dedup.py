@@ -0,0 +1,185 @@
+
+import re
+import json
+import time
+import argparse
+from dedup import digest64, minhash, jaccard, LSHIndex, clusters
+from json_output import RecordWriter, read_records
+from section_index import ENTRY_TYPES, iter_entry_types, note_body_start
+
+# Configuration
+INPUT_FILE = "legal_data.json"
+REPORT_FILE = "dedup_report.json"
+DROP_TYPES = ("toc", "note")   # table-of-contents lines and amendment footnotes
+SHINGLE_WORDS = 3
+THRESHOLD = 0.8             # word-shingle Jaccard similarity above which two entries are near-duplicates
+BOILERPLATE_MIN = 3         # the same text under this many section numbers of one act is boilerplate
+NOTE_KEEP_MIN = 500         # a note this long whose body text can't be found is kept whole
+PREVIEW_CHARS = 120
+
+# Post-processing for legal_data.json. The section splitter cuts on any
+# "number + capital letter", so besides the body sections the output holds
+# the arrangement of sections, amendment footnotes, and the same text
+# picked up several times (schedule forms, table headings like "Years",
+# repeated fragments). This drops the entry types in DROP_TYPES (a note
+# that runs on into the next page's text loses only its footnotes or page
+# header: the text is appended to the section the page break interrupted,
+# or kept as an entry of its own if the act has no section before it; a
+# note of NOTE_KEEP_MIN characters or more where no body text is found is
+# kept whole rather than risk losing statute text) and finds
+# near-duplicate body entries across all acts with MinHash/LSH (see
+# dedup.py), so only pairs that share a signature band are compared:
+#  - copies under the same act and section number are merged into one
+#    entry (the longest text, with Penalty/Relief filled from the copies);
+#  - text repeated under BOILERPLATE_MIN or more section numbers of one act
+#    is boilerplate: one entry (the longest, else the first) is kept and
+#    the repeats are dropped;
+#  - similar text in different acts (IPC and BNS share most wording) or
+#    under two section numbers is kept.
+# Every removed entry is listed in the report with the reason.
+
+WORD = re.compile(r'\w+')
+
+def shingles(text):
+    """64-bit digests of the casefolded word SHINGLE_WORDS-grams of text (shorter texts: one shingle)."""
+    words = WORD.findall(text.casefold())
+    k = min(SHINGLE_WORDS, len(words)) or 1
+    return {digest64(" ".join(words[i:i + k])) for i in range(max(1, len(words) - k + 1))}
+
+def merge_copies(records):
+    """One record for copies of the same section: the longest text, empty fields taken from the others."""
+    merged = dict(max(records, key=lambda r: len(r["Applicable_Scenario"])))
+    for field in ("Penalty", "Relief"):
+        if not merged.get(field):
+            merged[field] = next((r[field] for r in records if r.get(field)), merged.get(field, ""))
+    return merged
+
+def removal(index, record, reason, **extra):
+    return dict({"index": index, "Act_Name": record["Act_Name"], "Section": record["Section"], "reason": reason,
+                 "preview": record["Applicable_Scenario"][:PREVIEW_CHARS]}, **extra)
+
+def clause_in(record, field, text):
+    """The record's Penalty/Relief clause if it lies in text, else ""."""
+    clause = record.get(field, "")
+    return clause if clause and clause in text else ""
+
+def dedup_records(records, threshold=THRESHOLD, drop_types=DROP_TYPES):
+    """
+    (kept records in input order, removed entries, trimmed notes, notes kept
+    whole) for a list of extractor records. Kept records carry their Entry_Type.
+    """
+    removed = []
+    trimmed = []
+    whole = []
+    body = []               # (input index, record) of the entries that are kept so far
+    for i, (record, entry_type) in enumerate(zip(records, iter_entry_types(records))):
+        start = note_body_start(record["Applicable_Scenario"]) if entry_type == "note" else None
+        if entry_type in drop_types and start is not None:
+            text = record["Applicable_Scenario"][start:]
+            previous = body[-1][1] if body else None
+            if previous and previous["Act_Name"] == record["Act_Name"] and previous["Entry_Type"] == "section":
+                into = body[-1][0]
+                previous["Applicable_Scenario"] += " " + text
+                for field in ("Penalty", "Relief"):
+                    if not previous.get(field):
+                        previous[field] = clause_in(record, field, text)
+            else:
+                into = i
+                body.append((i, dict(record, Applicable_Scenario=text, Entry_Type="section",
+                                     Penalty=clause_in(record, "Penalty", text),
+                                     Relief=clause_in(record, "Relief", text))))
+            trimmed.append({"index": i, "Act_Name": record["Act_Name"], "Section": record["Section"],
+                            "kept_in": into, "kept_chars": len(text),
+                            "dropped": record["Applicable_Scenario"][:start][:PREVIEW_CHARS]})
+        elif entry_type == "note" and entry_type in drop_types and len(record["Applicable_Scenario"]) >= NOTE_KEEP_MIN:
+            body.append((i, dict(record, Entry_Type="note")))
+            whole.append(removal(i, record, "no body start found", chars=len(record["Applicable_Scenario"])))
+        elif entry_type in drop_types:
+            removed.append(removal(i, record, entry_type))
+        else:
+            body.append((i, dict(record, Entry_Type=entry_type)))
+
+    sets = [shingles(record["Applicable_Scenario"]) for _, record in body]
+    lsh = LSHIndex()
+    for n, digests in enumerate(sets):
+        lsh.add(n, minhash(digests))
+    similar = [(a, b) for a, b in lsh.candidate_pairs()
+               if body[a][1]["Act_Name"] == body[b][1]["Act_Name"] and jaccard(sets[a], sets[b]) >= threshold]
+
+    replace = {}            # position in body -> merged record
+    drop = set()
+    for group in clusters(similar, len(body)):
+        by_section = {}
+        for n in group:
+            by_section.setdefault(body[n][1]["Section"], []).append(n)
+        if len(by_section) >= BOILERPLATE_MIN:
+            keep = max(group, key=lambda n: len(body[n][1]["Applicable_Scenario"]))
+            for n in group:
+                if n != keep:
+                    drop.add(n)
+                    removed.append(removal(body[n][0], body[n][1], "boilerplate", copies=len(group),
+                                           kept_index=body[keep][0]))
+            continue
+        for copies in by_section.values():
+            if len(copies) < 2:
+                continue
+            first = copies[0]
+            merged = merge_copies([body[n][1] for n in copies])
+            replace[first] = merged
+            for n in copies[1:]:
+                drop.add(n)
+                removed.append(removal(body[n][0], body[n][1], "duplicate", kept_index=body[first][0],
+                                       similarity=round(jaccard(sets[first], sets[n]), 3)))
+
+    kept = [replace.get(n, record) for n, (_, record) in enumerate(body) if n not in drop]
+    removed.sort(key=lambda r: r["index"])
+    return kept, removed, trimmed, whole
+
+def dedup_file(input_file=INPUT_FILE, output_file=None, report_file=REPORT_FILE,
+               threshold=THRESHOLD, drop_types=DROP_TYPES, dry_run=False):
+    """Deduplicates an extractor output file (in place unless output_file is given) and writes the report."""
+    output_file = output_file or input_file
+    t0 = time.perf_counter()
+    records = list(read_records(input_file))
+    kept, removed, trimmed, whole = dedup_records(records, threshold, drop_types)
+    elapsed = time.perf_counter() - t0
+    reasons = {}
+    for entry in removed:
+        reasons[entry["reason"]] = reasons.get(entry["reason"], 0) + 1
+    report = {
+        "input": input_file,
+        "output": None if dry_run else output_file,
+        "threshold": threshold,
+        "summary": {"entries": len(records), "kept": len(kept), "removed": reasons,
+                    "notes_trimmed": len(trimmed), "notes_kept_whole": len(whole), "seconds": round(elapsed, 3)},
+        "removed": removed,
+        "trimmed": trimmed,
+        "kept_whole": whole
+    }
+    if not dry_run:
+        with RecordWriter(output_file, "jsonl" if output_file.endswith(".jsonl") else "json") as writer:
+            writer.write_all(kept)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"Deduplicated {input_file} in {elapsed:.2f}s: kept {len(kept)} of {len(records)} entries "
+          f"({', '.join(f'{n} {reason}' for reason, n in reasons.items()) or 'nothing'} removed, "
+          f"{len(trimmed)} note(s) trimmed to their body text, {len(whole)} long note(s) kept whole)")
+    print(f"Report saved to {report_file}" + ("" if dry_run else f"; data saved to {output_file}"))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Drop boilerplate and merge near-duplicate entries in extractor output.")
+    parser.add_argument("--input", default=INPUT_FILE, help="legal_data.json or .jsonl")
+    parser.add_argument("--output", help="Where to write the cleaned records (default: overwrite --input).")
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Word-shingle Jaccard similarity at which entries count as near-duplicates.")
+    parser.add_argument("--keep-type", action="append", choices=ENTRY_TYPES, default=[],
+                        help="Keep entries of this type instead of dropping them (can be given several times).")
+    parser.add_argument("--dry-run", action="store_true", help="Only write the report.")
+    args = parser.parse_args()
+    drop_types = tuple(t for t in DROP_TYPES if t not in args.keep_type)
+    dedup_file(args.input, args.output, args.report, args.threshold, drop_types, args.dry_run)
+
+if __name__ == "__main__":
+    main()
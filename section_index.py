@@ -0,0 +1,342 @@
+
+import re
+import sys
+import json
+import time
+import argparse
+from json_output import read_records
+from pdf_cache import file_digest
+
+# Configuration
+INPUT_FILE = "legal_data.json"
+SECTION_INDEX_FILE = "section_index.json"
+SECTION_INDEX_VERSION = 1
+
+# --- Telling sections apart from the table of contents and footnotes ---
+# The India Code PDFs open with an "ARRANGEMENT OF SECTIONS" listing every
+# section title, and carry amendment footnotes ("1. Subs. by Act 26 of 1955")
+# that the section splitter also picks up as numbered entries.
+
+ENTRY_TYPES = ("section", "toc", "note")
+HEAD_CHARS = 300
+ARRANGEMENT = re.compile(r'ARRANGEM\s?ENT\s+OF\s+SEC\s?TIONS')
+NOTE_START = re.compile(
+    r'(?:Subs\s?\.|Sub s\.|Ins\.|Added\b|Omitted\b|Rep\.|Certain words|Earlier ins|Now see|See\b|For the repealed'
+    r'|The (?:words?|proviso|brackets|figures?|letters?|Explanation|original|Original|Illustrations?|Act has been|Code has been)\b'
+    r'|It has been extended|Illustrations? .{0,20}(?:rep|omitted)|Explanation numbered|Renumbered'
+    r'|(?:Section|S\.|Cl\.|Clause) \w+ (?:ins|subs|omitted|re\s?-?\s?numbered|renumbered)'
+    r'|THE GAZETTE OF INDIA)'
+)
+# A note entry can run on into body text: a page's footnotes end with the
+# page number and the next page's text follows ("...the Second Schedule. 29
+# (a) where..."), and a gazette page header "[Part II—" (sometimes spaced
+# "[P ART II—", with "SEC. 1]" or a rule of underscores) comes before the
+# page's text. The last word of a footnote is a closing bracket or quote,
+# a token with a digit ("section 153A.") or a word of 3+ lowercase or 4+
+# letters, so that abbreviations like "s. 2" or "Reg. 1" do not end it.
+GAZETTE_HEADER = re.compile(r'THE GAZETTE OF INDIA EXTRAORDINARY\s*\[P\s?ART\s+II\s?[—–-](?:\s?SEC\.\s?\d+\])?_*\s*',
+                            re.IGNORECASE)
+FOOTNOTE_END = re.compile(r'(?:\)|”|\b\w*\d\w*|\b[a-z]{3,}|\b[A-Z][a-z]{3,})\s?\.\s+\d{1,4}\s+(?=\S)')
+NOTE_BODY_MIN = 40
+# Body sections start "Title.—Text"
+BODY_MARKER = re.compile(r'[—–]|\.-')
+SECTION_NUMBER = re.compile(r'\d+')
+
+def section_number(section):
+    m = SECTION_NUMBER.match(section)
+    return int(m.group()) if m else 0
+
+def note_body_start(content):
+    """Offset of the body text after a note entry's footnotes or page header, or None if it is all note."""
+    m = GAZETTE_HEADER.match(content) or FOOTNOTE_END.search(content)
+    if m and len(content) - m.end() >= NOTE_BODY_MIN:
+        return m.end()
+    return None
+
+class EntryClassifier:
+    """
+    Labels one act's entries, in document order, as "section" (body text),
+    "toc" (arrangement of sections) or "note" (amendment footnotes, gazette
+    page headers). The table of contents starts at "ARRANGEMENT OF SECTIONS"
+    and ends at the first "Title.—Text" entry whose number drops back below
+    the numbers listed so far.
+    """
+
+    def __init__(self):
+        self.in_toc = False
+        self.toc_max = 0
+
+    def classify(self, section, content):
+        head = content[:HEAD_CHARS]
+        if ARRANGEMENT.search(head):
+            self.in_toc = True
+            return "toc"
+        if NOTE_START.match(content):
+            return "note"
+        if self.in_toc:
+            number = section_number(section)
+            if BODY_MARKER.search(head) and number < self.toc_max:
+                self.in_toc = False
+                return "section"
+            self.toc_max = max(self.toc_max, number)
+            return "toc"
+        return "section"
+
+def iter_entry_types(records):
+    """Entry_Type of each record, classifying records from older outputs that lack it."""
+    classifiers = {}
+    for record in records:
+        entry_type = record.get("Entry_Type")
+        if entry_type is None:
+            classifier = classifiers.setdefault(record["Act_Name"], EntryClassifier())
+            entry_type = classifier.classify(record["Section"], record["Applicable_Scenario"])
+        yield entry_type
+
+# --- IPC -> BNS correspondence ---
+# From the Ministry of Home Affairs correspondence table for the offences the
+# crime categories and common complaints cite. BNS sub-sections are kept in
+# the value; records are keyed by the section number alone.
+IPC_TO_BNS = {
+    "34": "3(5)", "107": "45", "109": "49", "120A": "61(1)", "120B": "61(2)", "121": "147",
+    "141": "189(1)", "147": "191(2)", "148": "191(3)", "149": "190", "153A": "196", "171B": "170",
+    "191": "227", "193": "229", "268": "270", "279": "281", "292": "294", "295A": "299",
+    "299": "100", "300": "101", "302": "103(1)", "304": "105", "304A": "106(1)", "304B": "80",
+    "306": "108", "307": "109", "308": "110", "312": "88", "319": "114", "320": "116",
+    "323": "115(2)", "324": "118(1)", "325": "117(2)", "326": "118(2)", "326A": "124(1)",
+    "339": "126(1)", "340": "127(1)", "341": "126(2)", "342": "127(2)",
+    "354": "74", "354A": "75", "354B": "76", "354C": "77", "354D": "78",
+    "363": "137(2)", "364A": "140(2)", "366": "87", "370": "143", "375": "63", "376": "64", "376D": "70(1)",
+    "378": "303(1)", "379": "303(2)", "380": "305", "382": "307", "383": "308(1)", "384": "308(2)",
+    "390": "309(1)", "392": "309(4)", "395": "310(2)", "403": "314", "405": "316(1)", "406": "316(2)",
+    "409": "316(5)", "411": "317(2)", "415": "318(1)", "417": "318(2)", "419": "319(2)", "420": "318(4)",
+    "425": "324(1)", "426": "324(2)", "441": "329(1)", "447": "329(3)", "448": "329(4)",
+    "463": "336(1)", "465": "336(2)", "467": "338", "468": "336(3)", "471": "340(2)", "489A": "178",
+    "494": "82(1)", "498A": "85", "499": "356(1)", "500": "356(2)", "503": "351(1)", "506": "351(2)",
+    "509": "79"
+}
+IPC_ACT = "Indian Penal Code (IPC)"
+BNS_ACT = "Bharatiya Nyaya Sanhita (BNS)"
+SUBSECTION = re.compile(r'\(.*$')
+
+def base_section(section):
+    """Drops the sub-section: 318(4) -> 318."""
+    return SUBSECTION.sub('', section).strip()
+
+def bns_to_ipc(ipc_to_bns=IPC_TO_BNS):
+    reverse = {}
+    for ipc, bns in ipc_to_bns.items():
+        reverse.setdefault(base_section(bns), []).append(ipc)
+    return reverse
+
+# --- Citations ---
+# "Bharatiya Nyaya Sanhita, 2023 (Section 63/74) / IPC Section 376/354"
+NORMALIZE = re.compile(r'[^a-z0-9]+')
+YEAR = re.compile(r'\s*\b\d{4}\b\s*')
+ABBREVIATION = re.compile(r'\(([A-Z]{2,})\)')
+CITED_SECTIONS = re.compile(r'\bSections?\s+(\d+[A-Z]*(?:\s*(?:/|,|and)\s*\d+[A-Z]*)*)')
+SHORT_CITATION = re.compile(r'^\s*([A-Za-z][A-Za-z .]*?)\s*(?:Section|s\.)?\s*(\d+[A-Za-z]*)\s*$')
+
+def normalize(text):
+    return NORMALIZE.sub(' ', text.lower()).strip()
+
+def short_name(act_name):
+    """Indian Penal Code (IPC) -> IPC; acts without an abbreviation keep their name."""
+    m = ABBREVIATION.search(act_name)
+    return m.group(1) if m else act_name
+
+def act_aliases(act_names):
+    """Lookup keys for each act: full name, name without year, and its (ABBR)."""
+    aliases = {}
+    for act in act_names:
+        plain = ABBREVIATION.sub('', act)
+        for alias in (act, plain, YEAR.sub(' ', plain)):
+            aliases[normalize(alias)] = act
+        for abbreviation in ABBREVIATION.findall(act):
+            aliases[normalize(abbreviation)] = act
+    aliases.pop("", None)
+    return aliases
+
+class SectionIndex:
+    """
+    Canonical (act, section) -> section record lookup over the body sections
+    of legal_data.json, plus IPC <-> BNS resolution for citations.
+    """
+
+    def __init__(self, index):
+        if index.get("version") != SECTION_INDEX_VERSION:
+            raise ValueError(f"Unsupported section index version: {index.get('version')}")
+        self.acts = index["acts"]
+        self.ipc_to_bns = index.get("ipc_to_bns", IPC_TO_BNS)
+        self.bns_to_ipc = bns_to_ipc(self.ipc_to_bns)
+        self.source_sha256 = index.get("source_sha256")
+        self.aliases = act_aliases(self.acts)
+        # Act-name patterns, longest first, for finding acts inside citation text
+        self.alias_pattern = re.compile(r'\b(' + '|'.join(
+            re.escape(a) for a in sorted(self.aliases, key=len, reverse=True)) + r')\b')
+
+    @classmethod
+    def load(cls, path=SECTION_INDEX_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def act_name(self, name):
+        return self.aliases.get(normalize(name))
+
+    def lookup(self, act, section):
+        """The section record for an act name or alias and a section number, or None."""
+        act_name = self.act_name(act)
+        if act_name is None:
+            return None
+        return self.acts[act_name].get(base_section(str(section)).upper())
+
+    def resolve(self, act, section):
+        """
+        [(record, via)] for a cited section. If the act's own record is
+        missing, follows the IPC <-> BNS table; via then names the section
+        that was used, e.g. "IPC 420" for "BNS 318".
+        """
+        record = self.lookup(act, section)
+        if record is not None:
+            return [(record, None)]
+        act_name = self.act_name(act)
+        section = base_section(str(section)).upper()
+        if act_name == BNS_ACT:
+            pairs = [(IPC_ACT, ipc) for ipc in self.bns_to_ipc.get(section, [])]
+        elif act_name == IPC_ACT and section in self.ipc_to_bns:
+            pairs = [(BNS_ACT, base_section(self.ipc_to_bns[section]))]
+        else:
+            pairs = []
+        results = []
+        for other_act, other_section in pairs:
+            record = self.lookup(other_act, other_section)
+            if record is not None:
+                results.append((record, f"{short_name(other_act)} {other_section}"))
+        return results
+
+    def parse_citation(self, text):
+        """
+        [(act name, section or None)] for an Applicable_Law string. Each
+        " / "-separated part names an act and optionally "Section 63/74".
+        """
+        citations = []
+        for part in text.split(" / "):
+            m = self.alias_pattern.search(normalize(part))
+            if not m:
+                continue
+            act_name = self.aliases[m.group(1)]
+            sections = CITED_SECTIONS.search(part)
+            if not sections:
+                citations.append((act_name, None))
+                continue
+            for section in re.split(r'\s*(?:/|,|and)\s*', sections.group(1)):
+                citations.append((act_name, section))
+        return citations
+
+    def resolve_citation(self, text):
+        """Section records (with Act_Name, Section and Via) cited by an Applicable_Law string."""
+        results = []
+        seen = set()
+        for act_name, section in self.parse_citation(text):
+            if section is None:
+                continue
+            for record, via in self.resolve(act_name, section):
+                key = (record["Act_Name"], record["Section"])
+                if key not in seen:
+                    seen.add(key)
+                    results.append(dict(record, Cited_As=f"{short_name(act_name)} {section}", Via=via))
+        return results
+
+def build_section_index(records, source=None):
+    """
+    Keeps one record per (act, section): the first body section headed
+    "Title.—Text" if there is one, otherwise the first body section.
+    """
+    acts = {}
+    counts = {t: 0 for t in ENTRY_TYPES}
+    records = list(records)
+    for record, entry_type in zip(records, iter_entry_types(records)):
+        counts[entry_type] += 1
+        sections = acts.setdefault(record["Act_Name"], {})
+        if entry_type != "section":
+            continue
+        key = record["Section"].upper()
+        headed = bool(BODY_MARKER.search(record["Applicable_Scenario"][:HEAD_CHARS]))
+        current = sections.get(key)
+        if current is None or (headed and not current[0]):
+            sections[key] = (headed, record)
+
+    return {
+        "version": SECTION_INDEX_VERSION,
+        "source": source,
+        "source_sha256": file_digest(source) if source else None,
+        "entry_types": counts,
+        "ipc_to_bns": IPC_TO_BNS,
+        "acts": {act: {key: record for key, (_, record) in sections.items()} for act, sections in acts.items()}
+    }
+
+def rebuild_section_index(input_file=INPUT_FILE, index_file=SECTION_INDEX_FILE):
+    """Builds the section index from an extractor output file (.json or .jsonl) and saves it."""
+    t0 = time.perf_counter()
+    index = build_section_index(read_records(input_file), source=input_file)
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    sections = sum(len(s) for s in index["acts"].values())
+    print(f"Indexed {sections} sections of {len(index['acts'])} acts into {index_file} "
+          f"in {time.perf_counter() - t0:.2f}s ({index['entry_types']})")
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonical (act, section) index and IPC/BNS citation lookup.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the index from extractor output.")
+    build.add_argument("--input", default=INPUT_FILE, help="legal_data.json or .jsonl")
+    build.add_argument("--index", default=SECTION_INDEX_FILE)
+
+    lookup = sub.add_parser("lookup", help='Resolve a citation such as "IPC 420" or "BNS 318".')
+    lookup.add_argument("citation")
+    lookup.add_argument("--index", default=SECTION_INDEX_FILE)
+
+    citations = sub.add_parser("citations", help="Resolve every Applicable_Law in the crime KEYWORD_MAP.")
+    citations.add_argument("--index", default=SECTION_INDEX_FILE)
+
+    sub.add_parser("table", help="Print the IPC -> BNS correspondence table as CSV.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        rebuild_section_index(args.input, args.index)
+        return
+    if args.command == "table":
+        print("IPC_Section,BNS_Section")
+        for ipc, bns in IPC_TO_BNS.items():
+            print(f"{ipc},{bns}")
+        return
+
+    index = SectionIndex.load(args.index)
+    if args.command == "lookup":
+        m = SHORT_CITATION.match(args.citation)
+        if not m:
+            sys.exit(f'Expected "<act> <section>", e.g. "IPC 420", got {args.citation!r}')
+        t0 = time.perf_counter()
+        results = index.resolve(m.group(1), m.group(2))
+        elapsed = time.perf_counter() - t0
+        if not results:
+            print(f"No section found for {args.citation}")
+        for record, via in results:
+            note = f" (via {via})" if via else ""
+            print(f"{record['Act_Name']} - Section {record['Section']}{note}")
+            print(f"   {record['Applicable_Scenario'][:300]}")
+        print(f"Lookup took {elapsed * 1e6:.1f} us", file=sys.stderr)
+        return
+
+    from extract_crime_data import KEYWORD_MAP
+    for rule in KEYWORD_MAP:
+        resolved = index.resolve_citation(rule["Applicable_Law"])
+        print(f"{rule['Problem_Type']}: {rule['Applicable_Law']}")
+        for record in resolved:
+            via = f" via {record['Via']}" if record["Via"] else ""
+            print(f"   {record['Cited_As']} -> {record['Act_Name']} s. {record['Section']}{via}: "
+                  f"{record['Applicable_Scenario'][:80]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+
+import os
+import sys
+import json
+import mmap
+import time
+import argparse
+import subprocess
+from array import array
+from collections.abc import Mapping, Sequence
+from json_output import read_records
+from pdf_cache import file_digest
+
+# Configuration
+SNAPSHOT_FILE = "legal_data.snap"
+SNAPSHOT_MAGIC = b"LLSNAP01"
+SNAPSHOT_VERSION = 1
+ALIGN = 8
+# Dataset name -> source file, for build and bench
+DATASETS = {
+    "legal_data": "legal_data.json",
+    "problem_solution_data": "problem_solution_data.json",
+    "legal_templates": "legal_templates.json"
+}
+
+# Layout (same framing as advocate_store): 8-byte magic, 8-byte header
+# length, JSON header, then 8-byte aligned blocks in native byte order.
+# All datasets share one table of distinct strings (utf-8 blob + offsets),
+# so each repeated value is stored once. A dataset is a row-major uint32
+# grid of cells, one per (record, field): 2 * string id for a string,
+# 2 * string id + 1 for any other JSON value kept as JSON text in the
+# table, MISSING where the record lacks the field.
+MISSING = 0xFFFFFFFF
+
+def source_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def build_snapshot(sources, path=SNAPSHOT_FILE):
+    """Writes the records of each {dataset name: source file} into one snapshot. Returns {name: rows}."""
+    strings = {}
+    def intern(value):
+        if isinstance(value, str):
+            sid = strings.setdefault(value, len(strings))
+            return 2 * sid
+        text = json.dumps(value, ensure_ascii=False)
+        return 2 * strings.setdefault(text, len(strings)) + 1
+
+    blocks = []
+    size = 0
+    def add_block(data):
+        nonlocal size
+        blocks.append(data)
+        offset = size
+        size += len(data)
+        pad = -size % ALIGN
+        if pad:
+            blocks.append(b"\0" * pad)
+            size += pad
+        return [offset, len(data)]
+
+    datasets = {}
+    for name, source in sources.items():
+        stamp = source_stamp(source)
+        records = list(read_records(source))
+        fields = {}
+        for record in records:
+            for field in record:
+                fields.setdefault(field, len(fields))
+        width = len(fields)
+        cells = array("I", [MISSING]) * (len(records) * width)
+        for row, record in enumerate(records):
+            base = row * width
+            for field, value in record.items():
+                cells[base + fields[field]] = intern(value)
+        datasets[name] = {"source": source, "source_stamp": stamp, "source_sha256": file_digest(source),
+                          "rows": len(records), "fields": list(fields), "cells": add_block(cells.tobytes())}
+
+    encoded = [s.encode('utf-8', 'surrogatepass') for s in strings]
+    offsets = array("Q", [0])
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "strings": {"count": len(encoded), "offsets": add_block(offsets.tobytes()), "blob": add_block(b"".join(encoded))},
+        "datasets": datasets
+    }, ensure_ascii=False).encode('utf-8')
+    header += b" " * (-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % ALIGN)
+
+    with open(path + ".partial", 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for block in blocks:
+            f.write(block)
+    os.replace(path + ".partial", path)
+    return {name: meta["rows"] for name, meta in datasets.items()}
+
+class SnapshotRecord(Mapping):
+    """One record as a read-only mapping; each field is decoded when it is read."""
+
+    __slots__ = ("_dataset", "_row")
+
+    def __init__(self, dataset, row):
+        self._dataset = dataset
+        self._row = row
+
+    def _cell(self, field):
+        column = self._dataset.field_index.get(field)
+        if column is None:
+            return MISSING
+        return self._dataset.cells[self._row * self._dataset.width + column]
+
+    def __getitem__(self, field):
+        cell = self._cell(field)
+        if cell == MISSING:
+            raise KeyError(field)
+        return self._dataset.snapshot.value(cell)
+
+    def __contains__(self, field):
+        return self._cell(field) != MISSING
+
+    def __iter__(self):
+        base = self._row * self._dataset.width
+        cells = self._dataset.cells
+        for column, field in enumerate(self._dataset.fields):
+            if cells[base + column] != MISSING:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        dataset = self._dataset
+        base = self._row * dataset.width
+        value = dataset.snapshot.value
+        # Slices of the mapped cells are released at once, so that close() can unmap
+        with dataset.cells[base:base + dataset.width] as cells:
+            return {field: value(cell) for field, cell in zip(dataset.fields, cells) if cell != MISSING}
+
+    def __repr__(self):
+        return f"SnapshotRecord({self.to_dict()!r})"
+
+class SnapshotDataset(Sequence):
+    """The records of one dataset. Indexing creates a two-slot record view; nothing is decoded up front."""
+
+    def __init__(self, snapshot, meta):
+        self.snapshot = snapshot
+        self.source = meta["source"]
+        self.source_stamp = meta["source_stamp"]
+        self.source_sha256 = meta["source_sha256"]
+        self.rows = meta["rows"]
+        self.fields = meta["fields"]
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.width = len(self.fields)
+        self.cells = snapshot._view(meta["cells"], "I")
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [SnapshotRecord(self, r) for r in range(*row.indices(self.rows))]
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError("record index out of range")
+        return SnapshotRecord(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield SnapshotRecord(self, row)
+
+    def column(self, field, default=None):
+        """One field of every record (default where it is missing), reading only that column's cells."""
+        column = self.field_index.get(field)
+        if column is None:
+            return [default] * self.rows
+        value = self.snapshot.value
+        with self.cells[column::self.width] as cells:
+            return [default if cell == MISSING else value(cell) for cell in cells]
+
+    def to_dicts(self):
+        """Every record as a dict (strings shared between records, not copied)."""
+        value = self.snapshot.value
+        fields = self.fields
+        cells = self.cells.tolist()
+        width = self.width
+        return [{field: value(cell) for field, cell in zip(fields, cells[base:base + width]) if cell != MISSING}
+                for base in range(0, len(cells), width)]
+
+    def close(self):
+        """Closes the snapshot the dataset was read from (and with it its other datasets)."""
+        self.snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Snapshot:
+    """
+    Read-only, memory-mapped snapshot. Opening parses only the header; every
+    process that maps the file shares its pages through the page cache.
+    Distinct strings are decoded at most once and then shared by all records.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self.f = open(path, 'rb')
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.views = []
+        if self.mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        start = len(SNAPSHOT_MAGIC) + 8
+        header_len = int.from_bytes(self.mm[len(SNAPSHOT_MAGIC):start], 'little')
+        header = json.loads(self.mm[start:start + header_len].decode('utf-8'))
+        if header.get("version") != SNAPSHOT_VERSION or header.get("byteorder") != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written by an incompatible version or machine; rebuild it")
+        self.base = start + header_len
+        self.offsets = self._view(header["strings"]["offsets"], "Q")
+        self.blob = self._view(header["strings"]["blob"], "B")
+        self.strings = [None] * header["strings"]["count"]
+        self.datasets = {name: SnapshotDataset(self, meta) for name, meta in header["datasets"].items()}
+
+    def _view(self, block, typecode):
+        offset, length = block
+        view = memoryview(self.mm)[self.base + offset:self.base + offset + length].cast(typecode)
+        self.views.append(view)
+        return view
+
+    def string(self, sid):
+        text = self.strings[sid]
+        if text is None:
+            text = self.strings[sid] = str(self.blob[self.offsets[sid]:self.offsets[sid + 1]], 'utf-8', 'surrogatepass')
+        return text
+
+    def value(self, cell):
+        if cell & 1:
+            return json.loads(self.string(cell >> 1))
+        return self.string(cell >> 1)
+
+    def dataset(self, name):
+        return self.datasets[name]
+
+    def find(self, source):
+        """The dataset built from source if the file is unchanged since (same size and mtime), else None."""
+        try:
+            stamp = source_stamp(source)
+        except FileNotFoundError:
+            return None
+        for dataset in self.datasets.values():
+            if os.path.abspath(dataset.source) == os.path.abspath(source) and dataset.source_stamp == stamp:
+                return dataset
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.mm.close()
+        self.f.close()
+
+def load_records(source, snapshot_path=SNAPSHOT_FILE):
+    """
+    The records of an extractor output: from the snapshot when it holds a
+    current copy of source (lazy mapping records), otherwise parsed from
+    the JSON / JSON Lines file (dicts). A snapshot dataset keeps the file
+    mapped until it is closed; pass the records to close_records when done.
+    """
+    if os.path.exists(snapshot_path):
+        try:
+            snapshot = Snapshot(snapshot_path)
+        except ValueError:
+            snapshot = None
+        if snapshot is not None:
+            dataset = snapshot.find(source)
+            if dataset is not None:
+                return dataset
+            snapshot.close()
+    return list(read_records(source))
+
+def close_records(records):
+    """Closes the snapshot behind records from load_records (nothing to do for parsed lists)."""
+    if isinstance(records, SnapshotDataset):
+        records.close()
+
+# --- Benchmark ---
+# Each measurement runs in a fresh interpreter so that load time and memory
+# are not affected by earlier runs. RSS is split into private pages and pages
+# shared with other processes (the mapped file stays shared).
+
+def resident_kib():
+    """(resident, shared) KiB of this process, from /proc on Linux (zeros elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(x) for x in f.read().split()[:3])
+    except OSError:
+        return 0, 0
+    page = os.sysconf("SC_PAGE_SIZE") // 1024
+    return resident * page, shared * page
+
+def measure(mode, name, source, snapshot_path):
+    """Loads one dataset the given way; returns seconds, record count and memory growth."""
+    rss0, shared0 = resident_kib()
+    t0 = time.perf_counter()
+    if mode == "json":
+        records = list(read_records(source))
+        touched = sum(len(r.get("Problem_Type") or r.get("Section") or "") for r in records)
+    elif mode == "snapshot-open":
+        records = Snapshot(snapshot_path).dataset(name)
+        touched = len(records[0])
+    elif mode == "snapshot-field":
+        records = Snapshot(snapshot_path).dataset(name)
+        field = "Problem_Type" if "Problem_Type" in records.field_index else records.fields[0]
+        touched = sum(len(v or "") for v in records.column(field))
+    else:
+        records = Snapshot(snapshot_path).dataset(name).to_dicts()
+        touched = len(records)
+    elapsed = time.perf_counter() - t0
+    rss1, shared1 = resident_kib()
+    return {"seconds": elapsed, "records": len(records), "touched": touched,
+            "rss_kib": rss1 - rss0, "private_kib": (rss1 - shared1) - (rss0 - shared0)}
+
+BENCH_MODES = [
+    ("json", "json.load into dicts"),
+    ("snapshot-open", "snapshot: open + first record"),
+    ("snapshot-field", "snapshot: decode one field of every record"),
+    ("snapshot-dicts", "snapshot: decode everything into dicts"),
+]
+
+def run_bench(datasets, snapshot_path, repeat):
+    print(f"{'Dataset / mode':68s} {'Time ms':>9s} {'RSS KiB':>9s} {'Private KiB':>12s}")
+    for name, source in datasets.items():
+        for mode, label in BENCH_MODES:
+            runs = []
+            for _ in range(repeat):
+                out = subprocess.run([sys.executable, __file__, "--snapshot", snapshot_path, "measure", mode, name, source],
+                                     capture_output=True, text=True, check=True).stdout
+                runs.append(json.loads(out))
+            best = min(runs, key=lambda r: r["seconds"])
+            print(f"  {name + ': ' + label:66s} {best['seconds'] * 1000:9.1f} {best['rss_kib']:9,} {best['private_kib']:12,}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact memory-mapped snapshots of the extractor outputs.")
+    parser.add_argument("--snapshot", default=SNAPSHOT_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Write the snapshot from the JSON outputs.")
+    build.add_argument("--dataset", action="append", metavar="NAME=FILE",
+                       help=f"Dataset to include (default: {', '.join(f'{k}={v}' for k, v in DATASETS.items())}).")
+    sub.add_parser("info", help="Show the datasets in the snapshot and whether their sources changed.")
+    bench = sub.add_parser("bench", help="Compare load time and memory against json.load.")
+    bench.add_argument("--repeat", type=int, default=3, help="Runs per measurement (fastest is reported).")
+    measure_cmd = sub.add_parser("measure", help="One measurement in this process (used by bench).")
+    measure_cmd.add_argument("mode", choices=[m for m, _ in BENCH_MODES])
+    measure_cmd.add_argument("name")
+    measure_cmd.add_argument("source")
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        print(json.dumps(measure(args.mode, args.name, args.source, args.snapshot)))
+        return
+
+    datasets = DATASETS
+    if args.command == "build" and args.dataset:
+        datasets = dict(spec.split("=", 1) for spec in args.dataset)
+    datasets = {name: source for name, source in datasets.items() if os.path.exists(source)}
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        rows = build_snapshot(datasets, args.snapshot)
+        sources = sum(os.path.getsize(s) for s in datasets.values())
+        print(f"Wrote {sum(rows.values())} records of {len(rows)} dataset(s) to {args.snapshot} in "
+              f"{time.perf_counter() - t0:.2f}s ({os.path.getsize(args.snapshot) / 1e6:.2f} MB from {sources / 1e6:.2f} MB of JSON)")
+    elif args.command == "info":
+        with Snapshot(args.snapshot) as snapshot:
+            print(f"{args.snapshot}: {len(snapshot.strings)} distinct strings")
+            for name, dataset in snapshot.datasets.items():
+                status = "current" if snapshot.find(dataset.source) is dataset else "source changed"
+                print(f"  {name}: {len(dataset)} records, fields {', '.join(dataset.fields)} <- {dataset.source} ({status})")
+    else:
+        if not os.path.exists(args.snapshot):
+            build_snapshot(datasets, args.snapshot)
+        run_bench(datasets, args.snapshot, args.repeat)
+
+if __name__ == "__main__":
+    main()
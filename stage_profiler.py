@@ -0,0 +1,165 @@
+
+import json
+import time
+
+# Configuration
+REPORT_FILE = "extraction_profile.json"
+REGEX_PREFIX = "regex "
+
+# Stage timing for the extraction pipeline. Nothing here runs unless a
+# profiler is installed: instrumenting replaces module functions and
+# compiled patterns with timed wrappers, so the normal code paths carry no
+# checks. Stages nest (pypdf inside page reading, regexes inside the section
+# split), and every stage reports both its inclusive time and its self time
+# with the nested stages taken out.
+
+class StageProfiler:
+    """Per-file, per-stage call counts, wall and CPU time and item counts."""
+
+    def __init__(self):
+        self.file = None
+        self.stats = {}     # (file, stage) -> [calls, wall, cpu, self wall, self cpu, items]
+        self.stack = []     # [stage, wall start, cpu start, child wall, child cpu]
+        self.patches = []
+
+    def _entry(self, stage, file=None):
+        key = (file if file is not None else self.file, stage)
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = [0, 0.0, 0.0, 0.0, 0.0, 0]
+        return entry
+
+    def enter(self, stage):
+        self.stack.append([stage, time.perf_counter(), time.process_time(), 0.0, 0.0])
+
+    def exit(self, items=0):
+        stage, wall0, cpu0, child_wall, child_cpu = self.stack.pop()
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        entry = self._entry(stage)
+        entry[0] += 1
+        entry[1] += wall
+        entry[2] += cpu
+        entry[3] += wall - child_wall
+        entry[4] += cpu - child_cpu
+        entry[5] += items
+        if self.stack:
+            self.stack[-1][3] += wall
+            self.stack[-1][4] += cpu
+
+    def add(self, stage, wall, cpu, items=0, calls=1, file=None):
+        """Records time measured elsewhere (e.g. in a worker process) as a top-level stage."""
+        entry = self._entry(stage, file)
+        entry[0] += calls
+        entry[1] += wall
+        entry[2] += cpu
+        entry[3] += wall
+        entry[4] += cpu
+        entry[5] += items
+
+    def wrap(self, func, stage):
+        def timed(*args, **kwargs):
+            self.enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+        timed.__wrapped__ = func
+        return timed
+
+    def wrap_generator(self, func, stage):
+        """Times every next() of the generator func returns; items counts what it yielded."""
+        def timed(*args, **kwargs):
+            return self.time_iterator(func(*args, **kwargs), stage)
+        timed.__wrapped__ = func
+        return timed
+
+    def time_iterator(self, iterator, stage):
+        while True:
+            self.enter(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.exit()
+                return
+            except BaseException:
+                self.exit()
+                raise
+            self.exit(items=1)
+            yield item
+
+    def patch(self, obj, attr, value):
+        """setattr that restore() undoes."""
+        own = attr in vars(obj)     # instance attribute, or only found on the class
+        self.patches.append((obj, attr, getattr(obj, attr), own))
+        setattr(obj, attr, value)
+
+    def restore(self):
+        while self.patches:
+            obj, attr, original, own = self.patches.pop()
+            if own:
+                setattr(obj, attr, original)
+            else:
+                delattr(obj, attr)
+
+    def report(self):
+        """{"files": {file: {stage: stats}}, "stages": {stage: totals}, "regex": {pattern: totals}}."""
+        files = {}
+        totals = {}
+        for (file, stage), (calls, wall, cpu, self_wall, self_cpu, items) in self.stats.items():
+            stats = {"calls": calls, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6),
+                     "self_wall_s": round(self_wall, 6), "self_cpu_s": round(self_cpu, 6), "items": items}
+            files.setdefault(file or "(none)", {})[stage] = stats
+            total = totals.setdefault(stage, dict.fromkeys(stats, 0))
+            for k, v in stats.items():
+                total[k] = round(total[k] + v, 6)
+        return {
+            "files": files,
+            "stages": totals,
+            "regex": {stage[len(REGEX_PREFIX):]: t for stage, t in totals.items() if stage.startswith(REGEX_PREFIX)}
+        }
+
+    def write_report(self, path=REPORT_FILE, extra=None):
+        report = self.report()
+        if extra:
+            report.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        return report
+
+def format_stage_table(stages, title):
+    lines = [title, f"  {'Stage':40s} {'Calls':>9s} {'Wall s':>9s} {'Self s':>9s} {'CPU s':>9s} {'Self CPU':>9s} {'Items':>8s}"]
+    for stage, s in sorted(stages.items(), key=lambda item: -item[1]["self_wall_s"]):
+        lines.append(f"  {stage:40s} {s['calls']:>9,} {s['wall_s']:>9.3f} {s['self_wall_s']:>9.3f} "
+                     f"{s['cpu_s']:>9.3f} {s['self_cpu_s']:>9.3f} {s['items']:>8,}")
+    return "\n".join(lines)
+
+def format_report(report, page_stage, section_stage):
+    """Readable tables: totals by stage, then one line per file with pages/s and sections."""
+    parts = [format_stage_table(report["stages"], "Time by stage (self = without nested stages):")]
+    lines = ["Per file:", f"  {'File':40s} {'Pages':>7s} {'Sections':>9s} {'Wall s':>9s} {'CPU s':>9s} {'Pages/s':>9s}"]
+    for file, stages in report["files"].items():
+        wall = sum(s["self_wall_s"] for s in stages.values())
+        cpu = sum(s["self_cpu_s"] for s in stages.values())
+        pages = stages.get(page_stage, {}).get("items", 0)
+        sections = stages.get(section_stage, {}).get("items", 0)
+        lines.append(f"  {file[:40]:40s} {pages:>7,} {sections:>9,} {wall:>9.3f} {cpu:>9.3f} "
+                     f"{pages / wall if wall else 0:>9,.1f}")
+    parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+class TimedPattern:
+    """Stands in for a compiled pattern and times its matching methods."""
+
+    def __init__(self, profiler, pattern, stage):
+        self._profiler = profiler
+        self._pattern = pattern
+        self._stage = stage
+        for name in ("search", "match", "fullmatch", "split", "findall", "sub", "subn"):
+            setattr(self, name, profiler.wrap(getattr(pattern, name), stage))
+
+    def finditer(self, *args, **kwargs):
+        return self._profiler.time_iterator(self._pattern.finditer(*args, **kwargs), self._stage)
+
+    def __getattr__(self, name):
+        return getattr(self._pattern, name)
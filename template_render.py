@@ -0,0 +1,272 @@
+
+import os
+import re
+import csv
+import json
+import time
+import argparse
+from json_output import RecordWriter, read_records
+from pdf_cache import file_digest
+
+# Configuration
+TEMPLATES_FILE = "legal_templates.json"
+COMPILED_FILE = "legal_templates.compiled.json"
+COMPILED_VERSION = 2
+OUTPUT_FILE = "rendered_documents.jsonl"
+ERRORS_FILE = "render_errors.jsonl"
+TEMPLATE_FIELD = "Template_Name"    # input column naming the template, when --template is not given
+
+# The templates in legal_templates.json are plain text with "[Sender's Name]"
+# style placeholders. Compiling splits each one into literal segments and
+# slot numbers (segments[0], slot 0, segments[1], slot 1, ...), one field
+# per placeholder. A name that appears several times stands for different
+# things (the sender's and the recipient's [Address]), so its later
+# occurrences become fields of their own: "Address", "Address 2", ... The
+# compiled set is saved next to the templates with the checksum of the file
+# it came from and rebuilt when that changes.
+#
+# A field is filled from the input column with the placeholder's name
+# ("Sender's Name") or with its key ("senders_name", see field_key).
+
+PLACEHOLDER = re.compile(r'\[([^\[\]\n]{1,80})\]')
+KEY_WORD = re.compile(r'[a-z0-9]+')
+
+def field_key(name):
+    """Column-friendly form of a placeholder name: "Demand: Pay sum/Vacate/etc" -> "demand_pay_sum_vacate_etc"."""
+    return "_".join(KEY_WORD.findall(name.casefold().replace("'", "").replace("’", "")))
+
+def compile_template(content):
+    """
+    {"segments": literal text around the placeholders, "slots": field index
+    of each placeholder, "fields": field names, "placeholders": each field's
+    name in the template text}.
+    """
+    segments, slots, fields, placeholders = [], [], [], []
+    pos = 0
+    for m in PLACEHOLDER.finditer(content):
+        name = m.group(1).strip()
+        field, n = name, 1
+        while field in fields:
+            n += 1
+            field = f"{name} {n}"
+        segments.append(content[pos:m.start()])
+        slots.append(len(fields))
+        fields.append(field)
+        placeholders.append(name)
+        pos = m.end()
+    segments.append(content[pos:])
+    return {"segments": segments, "slots": slots, "fields": fields, "placeholders": placeholders}
+
+def compile_templates(records, source=None):
+    return {
+        "version": COMPILED_VERSION,
+        "source": source,
+        "source_sha256": file_digest(source) if source else None,
+        "templates": {t["Template_Name"]: compile_template(t["Content"]) for t in records}
+    }
+
+def rebuild_compiled(templates_file=TEMPLATES_FILE, compiled_file=COMPILED_FILE):
+    """Compiles a templates file (.json or .jsonl) and saves it."""
+    compiled = compile_templates(read_records(templates_file), source=templates_file)
+    with open(compiled_file, 'w', encoding='utf-8') as f:
+        json.dump(compiled, f, indent=4, ensure_ascii=False)
+    slots = sum(len(t["slots"]) for t in compiled["templates"].values())
+    print(f"Compiled {len(compiled['templates'])} templates ({slots} placeholders) into {compiled_file}")
+    return compiled
+
+class CompiledTemplate:
+    def __init__(self, name, compiled):
+        self.name = name
+        self.segments = compiled["segments"]
+        self.slots = compiled["slots"]
+        self.fields = compiled["fields"]
+        self.keys = [field_key(field) for field in self.fields]
+        self.placeholders = compiled["placeholders"]
+        # The segments and slots as one str.format pattern, so that filling
+        # a document is a single C-level call
+        parts = []
+        for segment, slot in zip(self.segments, self.slots + [None]):
+            parts.append(segment.replace("{", "{{").replace("}", "}}"))
+            if slot is not None:
+                parts.append(f"{{{slot}}}")
+        self.pattern = "".join(parts)
+
+    def values(self, record):
+        """
+        (value of each field, names of the fields the record does not fill);
+        missing ones keep their placeholder text.
+        """
+        values = []
+        missing = []
+        for field, key in zip(self.fields, self.keys):
+            value = record.get(field)
+            if value is None or value == "":
+                value = record.get(key)
+                if value is None or value == "":
+                    missing.append(field)
+                    value = f"[{self.placeholders[len(values)]}]"
+            values.append(value)
+        return values, missing
+
+    def render(self, record):
+        """(document, missing field names)."""
+        values, missing = self.values(record)
+        return self.pattern.format(*values), missing
+
+class TemplateSet:
+    """The compiled templates, found by exact or case-insensitive name."""
+
+    def __init__(self, compiled):
+        if compiled.get("version") != COMPILED_VERSION:
+            raise ValueError(f"Unsupported compiled templates version: {compiled.get('version')}")
+        self.source_sha256 = compiled.get("source_sha256")
+        self.templates = {name: CompiledTemplate(name, t) for name, t in compiled["templates"].items()}
+        self.by_folded = {name.casefold(): t for name, t in self.templates.items()}
+
+    @classmethod
+    def load(cls, path=COMPILED_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def load_or_build(cls, path=COMPILED_FILE, source=TEMPLATES_FILE):
+        """Loads the compiled templates, recompiling them if source changed since (or they are an older version)."""
+        try:
+            templates = cls.load(path) if os.path.exists(path) else None
+        except ValueError:
+            templates = None
+        if templates is None or templates.source_sha256 != file_digest(source):
+            templates = cls(rebuild_compiled(source, path))
+        return templates
+
+    def find(self, name):
+        return self.templates.get(name) or self.by_folded.get(name.casefold())
+
+    def get(self, name):
+        """Like find, but raises ValueError for an unknown name."""
+        template = self.find(name)
+        if template is None:
+            raise ValueError(f"Unknown template: {name} (known: {', '.join(self.templates)})")
+        return template
+
+def iter_input(path):
+    """Yields the records of a CSV, JSON or JSON Lines file."""
+    if path.endswith(".csv"):
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            yield from csv.DictReader(f)
+    else:
+        yield from read_records(path)
+
+def render_records(records, templates, template=None):
+    """
+    Yields (row, record, template name, document, missing fields), rows
+    counted from 1. The template is the given CompiledTemplate, or the one
+    named by the record's TEMPLATE_FIELD; document is None when there is no
+    such template.
+    """
+    for row, record in enumerate(records, 1):
+        chosen = template or templates.find(record.get(TEMPLATE_FIELD) or "")
+        if chosen is None:
+            yield row, record, record.get(TEMPLATE_FIELD), None, []
+            continue
+        document, missing = chosen.render(record)
+        yield row, record, chosen.name, document, missing
+
+def document_file_name(row, template_name, record_id=None):
+    stem = record_id if record_id else f"{row:06d}"
+    return f"{'_'.join(KEY_WORD.findall(str(stem).casefold()))}_{field_key(template_name)}.txt"
+
+def render_file(input_file, templates, template_name=None, output_file=OUTPUT_FILE, out_dir=None,
+                errors_file=ERRORS_FILE, allow_missing=False, id_field=None):
+    """
+    Renders every record of input_file and streams the documents to
+    output_file (JSON Lines) or to one text file each in out_dir. Records
+    with missing fields (unless allow_missing) or an unknown template are
+    written to errors_file and the batch carries on. Returns (rendered, errors).
+    """
+    template = templates.get(template_name) if template_name else None
+    rendered = failed = 0
+    t0 = time.perf_counter()
+    output = None if out_dir else RecordWriter(output_file, "jsonl")
+    errors = RecordWriter(errors_file, "jsonl")
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    try:
+        for row, record, name, document, missing in render_records(iter_input(input_file), templates, template):
+            record_id = record.get(id_field) if id_field else None
+            entry = {"Row": row, "Id": record_id} if id_field else {"Row": row}
+            entry["Template_Name"] = name
+            if missing:
+                entry["Missing"] = missing
+            if document is None or (missing and not allow_missing):
+                failed += 1
+                entry["Error"] = "unknown template" if document is None else "missing fields"
+                errors.write(entry)
+                continue
+            rendered += 1
+            if out_dir:
+                with open(os.path.join(out_dir, document_file_name(row, name, record_id)), 'w', encoding='utf-8') as f:
+                    f.write(document)
+            else:
+                entry["Document"] = document
+                output.write(entry)
+    except BaseException:
+        if output:
+            output.abort()
+        errors.abort()
+        raise
+    if output:
+        output.close()
+    errors.close()
+    elapsed = time.perf_counter() - t0
+    total = rendered + failed
+    print(f"Rendered {rendered} of {total} records in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} records/s) to {out_dir or output_file}")
+    if failed:
+        print(f"{failed} record(s) not rendered; see {errors_file}")
+    return rendered, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile legal_templates.json and fill the templates from case records.")
+    parser.add_argument("--templates", default=TEMPLATES_FILE)
+    parser.add_argument("--compiled", default=COMPILED_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("compile", help="Compile the templates into segments and slots.")
+
+    fields = sub.add_parser("fields", help="List the fields each template needs, with their column keys.")
+    fields.add_argument("--template", help="Only this template.")
+
+    render = sub.add_parser("render", help="Fill a template from every record of a CSV, JSON or JSON Lines file.")
+    render.add_argument("input")
+    render.add_argument("--template", help=f"Template for every record (default: the record's {TEMPLATE_FIELD}).")
+    render.add_argument("--output", default=OUTPUT_FILE, help="Rendered documents as JSON Lines.")
+    render.add_argument("--out-dir", help="Write one text file per document here instead of --output.")
+    render.add_argument("--errors", default=ERRORS_FILE, help="Records that could not be rendered, as JSON Lines.")
+    render.add_argument("--id-field", help="Input column identifying a record (kept in the output and file names).")
+    render.add_argument("--allow-missing", action="store_true",
+                        help="Render records with missing fields anyway, leaving their placeholders in.")
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        rebuild_compiled(args.templates, args.compiled)
+        return
+    templates = TemplateSet.load_or_build(args.compiled, args.templates)
+    if args.command == "fields":
+        try:
+            chosen = [templates.get(args.template)] if args.template else list(templates.templates.values())
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for template in chosen:
+            print(f"{template.name}: {len(template.fields)} field(s)")
+            for field, key in zip(template.fields, template.keys):
+                print(f"  {field:40s} {key}")
+        return
+    try:
+        render_file(args.input, templates, args.template, args.output, args.out_dir,
+                    args.errors, args.allow_missing, args.id_field)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+
+from section_index import note_body_start
+from section_dedup import NOTE_KEEP_MIN, dedup_records
+
+# Notes that run on into body text must lose only their footnotes or page
+# header (the texts are taken from the extractor output of the acts named).
+
+CPA_HEADER = "THE GAZETTE OF INDIA EXTRAORDINARY [P ART II— "
+CPA_BODY = ("(3) The District Commission shall ordinarily function in the district headquarters and may perform "
+            "its functions at such other place in the district, as the State Government may, in consultation "
+            "with the State Commission, notify in the Official Gazette from time to time.")
+IPC_FOOTNOTE = "Subs. by Act 35 of 1969, s. 2, for section 153A. 41 "
+IPC_BODY = ("(b) commits any act which is prejudicial to the maintenance of harmony between different religious, "
+            "racial, language or regional groups or castes or communities, shall be punished with imprisonment "
+            "which may extend to three years, or with fine, or with both.")
+TPA_FOOTNOTE = ("The words and figures “Notwithstanding anything contained in the Trustees’ and Mortgagees’ Powers "
+                "Act, 1866 (28 of 1866)” omitted by Act 48 of 1952, s. 3 and the Second Schedule. 29 ")
+TPA_BODY = ("(a) where the mortgage is an English mortgage, and neither the mortgagor nor the mortgagee is a Hindu, "
+            "Muhammadan or Buddhist or a member of any other race, sect, tribe or class from time to time specified.")
+
+def record(act, section, text, penalty=""):
+    return {"Act_Name": act, "Section": section, "Applicable_Scenario": text, "Penalty": penalty, "Relief": ""}
+
+def test_body_start_after_spaced_gazette_header():
+    assert note_body_start(CPA_HEADER + CPA_BODY) == len(CPA_HEADER)
+
+def test_body_start_after_footnote_ending_in_section_number():
+    assert note_body_start(IPC_FOOTNOTE + IPC_BODY) == len(IPC_FOOTNOTE)
+
+def test_body_start_after_footnote_ending_in_capitalised_word():
+    assert note_body_start(TPA_FOOTNOTE + TPA_BODY) == len(TPA_FOOTNOTE)
+
+def test_note_body_is_appended_to_the_interrupted_section():
+    act = "Indian Penal Code (IPC)"
+    penalty = "shall be punished with imprisonment which may extend to three years"
+    records = [record(act, "153A", "Promoting enmity between different groups.—(1) Whoever— (a) by words, "
+                                   "either spoken or written, promotes disharmony between groups, or"),
+               record(act, "1", IPC_FOOTNOTE + IPC_BODY, penalty)]
+    kept, removed, trimmed, whole = dedup_records(records)
+    assert len(kept) == 1 and not removed and not whole
+    assert kept[0]["Applicable_Scenario"].endswith(IPC_BODY)
+    assert kept[0]["Penalty"] == penalty
+    assert trimmed[0]["kept_in"] == 0
+
+def test_note_body_is_not_appended_to_a_kept_toc_entry():
+    act = "Consumer Protection Act 2019"
+    records = [record(act, "1", "ARRANGEMENT OF SECTIONS CHAPTER I PRELIMINARY SECTIONS 1. Short title."),
+               record(act, "18", CPA_HEADER + CPA_BODY)]
+    kept, _, trimmed, _ = dedup_records(records, drop_types=("note",))
+    assert [r["Entry_Type"] for r in kept] == ["toc", "section"]
+    assert kept[1]["Applicable_Scenario"] == CPA_BODY
+    assert trimmed[0]["kept_in"] == 1
+
+def test_long_note_without_body_start_is_kept_whole():
+    act = "Transfer of Property Act 1882"
+    text = "The Act has been extended to — " + "the former State of Travancore -Cochin, w.e.f. 1 -5-1952; " * 10
+    assert len(text) >= NOTE_KEEP_MIN and note_body_start(text) is None
+    kept, removed, _, whole = dedup_records([record(act, "5", text), record(act, "6", "Omitted by Act 20 of 1929.")])
+    assert [r["Applicable_Scenario"] for r in kept] == [text]
+    assert [w["index"] for w in whole] == [0] and [r["index"] for r in removed] == [1]
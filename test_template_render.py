@@ -0,0 +1,46 @@
+
+from template_render import TemplateSet, compile_template, compile_templates
+from json_output import read_records
+
+# Repeated placeholders ([Address] for both parties) must be filled separately.
+
+def load_templates():
+    return TemplateSet(compile_templates(read_records("legal_templates.json")))
+
+def test_repeated_placeholder_gets_its_own_field():
+    compiled = compile_template("[Address] to [Address] via [Address 2] on [Date]")
+    assert compiled["fields"] == ["Address", "Address 2", "Address 2 2", "Date"]
+    assert compiled["placeholders"] == ["Address", "Address", "Address 2", "Date"]
+
+def test_legal_notice_keeps_both_addresses():
+    template = load_templates().find("Legal Notice Format")
+    record = {field: f"<{field}>" for field in template.fields}
+    record.update({"Address": "12 Sender Road", "Address 2": "34 Recipient Street"})
+    document, missing = template.render(record)
+    assert not missing
+    sender, recipient = document.split("To,", 1)
+    assert "12 Sender Road" in sender and "34 Recipient Street" not in sender
+    assert recipient.lstrip().startswith("<Recipient's Name>\n34 Recipient Street\n")
+
+def test_consumer_complaint_keeps_both_addresses():
+    template = load_templates().find("Consumer Complaint Format")
+    record = {key: f"<{key}>" for key in template.keys}
+    record.update({"address": "5 Complainant Lane", "address_2": "9 Company Park"})
+    document, missing = template.render(record)
+    assert not missing
+    assert "5 Complainant Lane     ... Complainant" in document
+    assert "9 Company Park     ... Opposite Party" in document
+
+def test_missing_repeat_keeps_its_placeholder_text():
+    template = load_templates().find("Consumer Complaint Format")
+    record = {field: "x" for field in template.fields if field != "Address 2"}
+    document, missing = template.render(record)
+    assert missing == ["Address 2"]
+    assert "[Address]     ... Opposite Party" in document
+
+def test_placeholders_round_trip():
+    templates = load_templates()
+    for record in read_records("legal_templates.json"):
+        template = templates.find(record["Template_Name"])
+        filled = {field: f"[{name}]" for field, name in zip(template.fields, template.placeholders)}
+        assert template.render(filled)[0] == record["Content"]